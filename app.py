@@ -1,21 +1,35 @@
-from panda2d import PandaWindow, Color, Font, Image, Sound, Key, Anchor, Resizable
+from panda2d import SceneNode, PandaWindow, Color, Font, Image, Sound, Key, Anchor, Resizable
 import math
+import os
+import time
+import numpy as np
 from extention import Extension, ExtendMethod
-from teams import RedFleet, BlueAlliance, GreenSquadron
+from teams import RedFleet, BlueAlliance, GreenSquadron, TeamRegistry
 from units import Battleship
-from utility import distance
+from projectiles import ProjectilePool
+from visibility import VisibilityGrid
+from terrain import TerrainStreamer
+from targeting import TargetingSystem
+from simulation import SIM_KEYS, TICK_RATE, SimulationProcess, unit_class
+from particles import ParticlePool, emit_wakes
+from clusters import ClusterGrid
+from entities import NO_HANDLE, EntityRegistry
+from orders import PlanScheduler, WaypointQueues
 
 
 class GameWindow(PandaWindow):
     """Main window for Fleet Command game."""
 
-    def __init__(self):
+    def __init__(self, split_simulation: bool = False):
+        # Split mode runs the simulation in a child process (see simulation.py)
+        self.split_simulation = split_simulation
         super().__init__(
             width=800,
             height=600,
             title="Fleet Command",
             resizable=Resizable.BOTH,
-            anchor=Anchor.CENTER
+            anchor=Anchor.CENTER,
+            asset_pack="assets/assets.pack"
         )
 
 
@@ -29,23 +43,30 @@ class GameWindow(PandaWindow):
         self.extension.scale = 1.0
 
         # Camera zoom
-        self.camera_zoom = 1.0
+        self.camera.zoom = 1.0
+        self.camera.scale = self.extension.scale
 
         # Extension scaling factors
         self.extension_change_factor = 20.0
         self.extension_change_offset = 1.0
 
+        # Hover highlighting uses the mouse position re-sampled right before drawing
+        self.late_latch = True
+
         # Track key state for scaling
         self.plus_last_frame = False
         self.minus_last_frame = False
+        self.fog_key_last_frame = False
+        self.capture_key_last_frame = False
+        self.profile_key_last_frame = False
 
         # Fonts & Images
         self.title_font = Font("assets/fonts/BlackOpsOne-Regular.ttf", size=32)
         self.context_font = Font("assets/fonts/WDXLLubrifontSC-Regular.ttf", size=16)
-        self.water_image = Image("assets/images/water.jpg")
+        self.water_image = Image("assets/images/water.jpg", mipmaps=True)
         self.water_image_scale = 0.3
-        self.selection_arrow_image = Image("assets/images/selection-arrow.png")
-        self.target_image = Image("assets/images/target.png")
+        self.selection_arrow_image = Image("assets/images/selection-arrow.png", mipmaps=True)
+        self.target_image = Image("assets/images/target.png", mipmaps=True)
 
         # UI Colors & Panel Settings
         self.side_panel_color = Color(0, 0, 144, 200)
@@ -58,34 +79,189 @@ class GameWindow(PandaWindow):
         self.title_text_shadow_offset = 1
 
         # Screen position tracking
-        self.camera_position_x = 0
-        self.camera_position_y = 0
+        self.camera.x = 0
+        self.camera.y = 0
         self.camera_move_speed = 200
 
         # Water layer position
         self.water_layer_position = 100
         self.water_layer_position_speed = 10
+        self.water_layer_filters = [Color(200, 200, 200, 255), Color(150, 150, 150, 120)]
+        # Pre-composited water layers, rebuilt when the tile size, filters or target change
+        self.water_sheet = None
+        self.water_sheet_key = None
+        self.water_sheet_max_ratio = 4  # Largest sheet allowed, in multiples of the target's area
+
+        # Terrain (open sea when no map has been generated)
+        self.terrain_path = "maps/default"
+        self.terrain = TerrainStreamer(self.terrain_path) if os.path.exists(self.terrain_path) else None
+
+        # Quality knobs (one value per tier, highest quality first)
+        self.quality.register_knob("water_layers", [2, 2, 1, 1])
+        self.quality.register_knob("sprite_lod_pixels", [0, 4, 8, 12])
+        self.quality.register_knob("hud_interval", [1, 2, 4, 8])
+        self.quality.register_knob("world_render_scale", [1.0, 1.0, 0.75, 0.5])
+        self.quality.register_knob("particle_budget", [256, 192, 128, 64])
+        self.hud_layer = None
+        self.hud_frame = 0
 
         # Teams
         self.teams = [RedFleet(), BlueAlliance(), GreenSquadron()]
 
-        # Units
-        self.units = [Battleship(self.teams[0], 100, 100, 267), Battleship(self.teams[1], -100, 200, 20), Battleship(self.teams[2], 50, -150, -50)]
-
-        # Selection
-        self.selected_unit_index = -1
+        self.team_registry = TeamRegistry(self.teams)
+        self.team_info_key = None
+        self.team_info_images = []
+
+        # Strategic zoom: below enter_factor units draw as per-team clusters until zoomed past exit_factor
+        self.clusters = ClusterGrid(len(self.teams))
+        self.strategic_view = False
+        self.strategic_enter_factor = 0.25
+        self.strategic_exit_factor = 0.35
+        self.cluster_pixels = 48  # Minimum on-screen cluster cell size
+        self.cluster_icon_pixels = 28
+        self.cluster_labels = {}
+
+        # Fog of war (None shows every team; F cycles through the teams' views)
+        self.visibility = VisibilityGrid(len(self.teams))
+        self.fog_team = None
+
+        # Orders: right click sets a waypoint, shift+right click queues one and P toggles patrol.
+        # Autonomous units are re-planned a slice at a time and dead-reckon in between.
+        self.waypoints = WaypointQueues(capacity=4096)
+        self.ai_scheduler = PlanScheduler(interval=6, max_per_tick=64)
+        self.waypoint_arrive_distance = 200  # Distance at which a ship turns for its next waypoint (about its turning circle)
+        self.waypoint_stop_distance = 10
+        self.order_button_last_frame = False
+        self.patrol_key_last_frame = False
+        self.waypoint_path_color = Color(170, 190, 210)
+
+        # Units (sprites and their attached markers hang off the scene root)
+        self.scene = SceneNode()
+        self.entities = EntityRegistry()
+        self._unit_positions_cache = None  # (xs, ys, radii) aligned with units; dropped when they move
+        for unit in [Battleship(self.teams[0], 100, 100, 267), Battleship(self.teams[1], -100, 200, 20), Battleship(self.teams[2], 50, -150, -50)]:
+            self.spawn_unit(unit)
+
+        # Selection (a handle, so it goes stale instead of shifting when units despawn)
+        self.selected_unit_handle = NO_HANDLE
         self.selected_unit_target_position = (0, 0)
         self.unit_select_distance = 100  # Distance threshold for selecting a unit
-
+        self.unit_select_max_pixels = 6  # Only hulls smaller than this on screen are picked by distance
+        self._hover_key = None
+        self.hovered_unit_handle = NO_HANDLE
+
+        # Projectiles
+        self.projectiles = ProjectilePool(capacity=4096)
+        self.projectile_color = Color(255, 220, 120)
+        self.salvo_spread = 2  # Degrees between shells in one salvo
+
+        # Effects (wakes and explosions); palette indices are the particle colors
+        self.particles = ParticlePool(capacity=4096, max_emit_per_frame=256)
+        self.particle_palette = [Color(225, 235, 245, 150), Color(255, 170, 50, 230), Color(70, 70, 70, 160)]
+        self.foam_color, self.fire_color, self.smoke_color = 0, 1, 2
+
+        # Target acquisition (nearest visible enemy in weapon range)
+        self.targeting = TargetingSystem(stagger=4)
+
+        # Simulation child process (split mode only); the units above become mirrors of its state
+        self.simulation = SimulationProcess(projectile_capacity=self.projectiles.capacity,
+                                            waypoint_capacity=self.waypoints.capacity) if self.split_simulation else None
+        self.simulation_tick = 0
+        self.projectile_positions = (np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32))
+
+    @property
+    def units(self):
+        """Live units, densely packed; the order changes as units despawn."""
+        return self.entities.items
+
+    def spawn_unit(self, unit):
+        """Add a unit to the world and the team bookkeeping."""
+        unit.handle = self.entities.spawn(unit)
+        if unit.id is None:
+            unit.id = unit.handle
+        self.team_registry.add(unit)
+        unit.sync_node()
+        # The arrow floats above the ship without turning with it
+        unit.arrow_node = unit.node.add_child(SceneNode(
+            self.selection_arrow_image, y=150, scale=0.05, layer=2, filter=unit.team.color, inherit_rotation=False))
+        # The move marker lives in world space, so it hangs off the root rather than the ship
+        unit.target_node = self.scene.add_child(SceneNode(self.target_image, scale=0.05, layer=1, visible=False))
+        self.scene.add_child(unit.node)
+        self._unit_positions_cache = None
+        return unit
+
+    def despawn_unit(self, unit):
+        """Remove a unit from the world; handles to it go stale."""
+        self.team_registry.remove(unit)
+        self.visibility.remove_unit(unit)
+        self.clusters.remove_unit(unit)
+        self.scene.remove_child(unit.node)
+        self.scene.remove_child(unit.target_node)
+        self.waypoints.clear(unit.handle)
+        self.entities.despawn(unit.handle)
+        self._unit_positions_cache = None
+
+    def clear_units(self):
+        """Remove every unit from the world."""
+        for unit in list(self.units):
+            self.despawn_unit(unit)
+        self.selected_unit_handle = NO_HANDLE
 
 
     def update(self):
         """Update game state and handle input."""
         self._handle_input()
         self._update_water_layer()
+        self._update_terrain()
+        self.particles.max_emit_per_frame = self.quality.get("particle_budget", 256)
+        self.particles.begin_frame()
+        if self.simulation is not None:
+            self._sync_simulation()
+        else:
+            self._update_simulation()
+        self._update_effects()
+        self._update_clusters()
+
+    def is_idle(self):
+        # Split mode keeps ticking in the child, so only a local simulation can go idle
+        if self.simulation is not None or self.projectiles.count or self.particles.count:
+            return False
+        if self.terrain is not None and self.terrain.loading:
+            # Finished chunks are collected in update() but only appear once drawn
+            return False
+        return all(
+            abs(unit.velocity_x) < 0.5 and abs(unit.velocity_y) < 0.5 and abs(unit.velocity_rotation) < 0.5
+            and unit.reload_timer == 0
+            for unit in self.units
+        )
+
+    def profile_tags(self):
+        tags = super().profile_tags()
+        tags.update(
+            units=len(self.units),
+            team_units={team.name: self.team_registry.count(team) for team in self.teams},
+            projectiles=int(self.projectiles.count),
+            particles=int(self.particles.count),
+            strategic_view=self.strategic_view,
+            split_simulation=self.simulation is not None,
+        )
+        return tags
+
+    def shutdown(self):
+        if self.simulation is not None:
+            self.simulation.close()
+            self.simulation = None
+        if self.terrain is not None:
+            self.terrain.close()
+
+    def _update_simulation(self):
         self._update_unit_selection()
         self._update_unit_input()
         self._update_unit_movement()
+        self._update_targeting()
+        self._update_weapons()
+        self._update_projectiles()
+        self._update_visibility()
 
     def _handle_input(self):
         growth = self.extension_change_offset + self.extension_change_factor * self.deltatime
@@ -98,47 +274,108 @@ class GameWindow(PandaWindow):
             elif self.keydown(Key.MINUS) and not self.minus_last_frame:
                 self.extension.scale /= growth
                 self.minus_last_frame = True
+            self.camera.scale = self.extension.scale
         else:
             if self.keydown(Key.EQUALS) and not self.plus_last_frame:
-                self.camera_zoom += zoom_speed
+                self.camera.zoom += zoom_speed
                 self.plus_last_frame = True
             elif self.keydown(Key.MINUS) and not self.minus_last_frame:
-                self.camera_zoom = max(0.1, self.camera_zoom - zoom_speed)
+                self.camera.zoom = max(0.1, self.camera.zoom - zoom_speed)
                 self.minus_last_frame = True
         if not self.keydown(Key.EQUALS):
             self.plus_last_frame = False
         if not self.keydown(Key.MINUS):
             self.minus_last_frame = False
+        if self.keydown(Key.F) and not self.fog_key_last_frame:
+            views = [None] + self.teams
+            self.fog_team = views[(views.index(self.fog_team) + 1) % len(views)]
+        self.fog_key_last_frame = self.keydown(Key.F)
+        if self.keydown(Key.F9) and not self.capture_key_last_frame:
+            if self.capture is None:
+                self.start_capture(os.path.join("captures", time.strftime("%Y%m%d-%H%M%S")))
+            else:
+                self.stop_capture()
+        self.capture_key_last_frame = self.keydown(Key.F9)
+        if self.keydown(Key.F10) and not self.profile_key_last_frame:
+            if self.profile is None:
+                # Shift+F10 runs cProfile instead of the stack sampler; the two would distort each other
+                use_cprofile = self.keydown(Key.LSHIFT) or self.keydown(Key.RSHIFT)
+                self.start_profile(os.path.join("profiles", f"{time.strftime('%Y%m%d-%H%M%S')}-{len(self.units)}units"),
+                                   use_cprofile=use_cprofile)
+            else:
+                self.stop_profile()
+        self.profile_key_last_frame = self.keydown(Key.F10)
+        move = self.camera_move_speed * self.deltatime
+        pan_x, pan_y = 0, 0
         if self.keydown(Key.LEFT):
-            self.camera_position_x += self.camera_move_speed * self.deltatime
+            pan_x += move
         if self.keydown(Key.RIGHT):
-            self.camera_position_x -= self.camera_move_speed * self.deltatime
+            pan_x -= move
         if self.keydown(Key.UP):
-            self.camera_position_y -= self.camera_move_speed * self.deltatime
+            pan_y -= move
         if self.keydown(Key.DOWN):
-            self.camera_position_y += self.camera_move_speed * self.deltatime
+            pan_y += move
+        if pan_x or pan_y:
+            self.camera.pan(pan_x, pan_y)
+        # Hysteresis keeps the view from flickering between modes around one zoom level
+        factor = self.camera.factor
+        if self.strategic_view and factor > self.strategic_exit_factor:
+            self.strategic_view = False
+        elif not self.strategic_view and factor < self.strategic_enter_factor:
+            self.strategic_view = True
 
     def _update_water_layer(self):
         self.water_layer_position += self.water_layer_position_speed * self.deltatime
         if self.water_layer_position > 200:
             self.water_layer_position = 0
 
+    def _update_terrain(self):
+        if self.terrain:
+            self.terrain.update(self.camera.visible_world_rect())
+
     def _update_unit_selection(self):
-        closest_unit_index = -1
-        closest_distance = float('inf')
-        # Transform mouse position to world coordinates considering scale and zoom
-        mouse_world_x = (self.mousex - self.screen_center_x) / (self.extension.scale * self.camera_zoom) - self.camera_position_x
-        mouse_world_y = (self.mousey - self.screen_center_y) / (self.extension.scale * self.camera_zoom) - self.camera_position_y
-        for index, unit in enumerate(self.units):
-            dist = distance(unit.position_x, unit.position_y, mouse_world_x, mouse_world_y)
-            if dist < closest_distance:
-                closest_distance = dist
-                closest_unit_index = index
         if self.mousedownprimary:
-            if closest_distance < self.unit_select_distance:
-                self.selected_unit_index = closest_unit_index
-            else:
-                self.selected_unit_index = -1
+            # Transform mouse position to world coordinates considering scale and zoom
+            mouse_world_x, mouse_world_y = self.camera.screen_to_world(self.mousex, self.mousey)
+            self.selected_unit_handle = self.pick_unit(mouse_world_x, mouse_world_y)
+
+    def pick_unit(self, world_x, world_y):
+        """Return the handle of the unit under a world point, or NO_HANDLE.
+
+        Units whose bounding circle contains the point are tested against
+        their rotated sprite mask, nearest first. Without a pixel hit, the
+        closest unit within unit_select_distance is picked only if its hull
+        is under unit_select_max_pixels on screen, too small to hit directly.
+        """
+        if not self.units:
+            return NO_HANDLE
+        xs, ys, radii = self._unit_positions()
+        dx = world_x - xs
+        dy = world_y - ys
+        distance_sq = dx * dx + dy * dy
+        candidates = np.flatnonzero(distance_sq <= radii * radii)
+        for index in candidates[np.argsort(distance_sq[candidates])].tolist():
+            unit = self.units[index]
+            if unit.image.hit_test(dx[index] / unit.scale, dy[index] / unit.scale, unit.direction):
+                return unit.handle
+        closest = int(np.argmin(distance_sq))
+        unit = self.units[closest]
+        if distance_sq[closest] >= self.unit_select_distance ** 2:
+            return NO_HANDLE
+        if 2 * unit.radius * self.camera.factor >= self.unit_select_max_pixels:
+            return NO_HANDLE
+        return unit.handle
+
+    def _unit_positions(self):
+        """Return (xs, ys, radii) arrays aligned with units, built at most once per tick."""
+        if self._unit_positions_cache is None:
+            units = self.units
+            self._unit_positions_cache = (
+                np.array([unit.position_x for unit in units]),
+                np.array([unit.position_y for unit in units]),
+                np.array([unit.radius for unit in units]),
+            )
+        return self._unit_positions_cache
 
     def _update_unit_input(self):
         def manual_override():
@@ -148,30 +385,41 @@ class GameWindow(PandaWindow):
                 self.keydown(Key.A),
                 self.keydown(Key.D)
             ])
-        
+
         def detect_autonomous_activation(unit):
-            if self.mousedownsecondary:
-                mouse_world_x = (self.mousex - self.screen_center_x) / (self.extension.scale * self.camera_zoom) - self.camera_position_x
-                mouse_world_y = (self.mousey - self.screen_center_y) / (self.extension.scale * self.camera_zoom) - self.camera_position_y
+            if not self.mousedownsecondary:
+                return
+            mouse_world_x, mouse_world_y = self.camera.screen_to_world(self.mousex, self.mousey)
+            if self.keydown(Key.LSHIFT) or self.keydown(Key.RSHIFT):
+                # Queue one waypoint per click behind the current orders
+                if self.order_button_last_frame or not self.waypoints.append(unit.handle, mouse_world_x, mouse_world_y):
+                    return
+                if not unit.autonomous:
+                    unit.autonomous_target_x, unit.autonomous_target_y = self.waypoints.current(unit.handle)
+                    unit.autonomous = True
+            else:
+                # A plain click replaces the orders; holding the button drags the waypoint
+                self.waypoints.set(unit.handle, mouse_world_x, mouse_world_y)
                 unit.autonomous_target_x = mouse_world_x
                 unit.autonomous_target_y = mouse_world_y
                 unit.autonomous = True
+            self._plan_unit(unit)
 
         def detect_autonomous_deactivation(unit, is_selected):
             if is_selected and manual_override():
                 unit.autonomous = False
+                self.waypoints.clear(unit.handle)
+
+        def detect_patrol_toggle(unit):
+            if self.keydown(Key.P) and not self.patrol_key_last_frame:
+                self.waypoints.set_patrol(unit.handle, not self.waypoints.patrolling(unit.handle))
 
         def autonomous_input(unit): # Return where autonomous thinks the unit should go
-            # Improved autonomous behavior: smooth turning and speed control
-            target_x, target_y = unit.autonomous_target_x, unit.autonomous_target_y
-            dx = target_x - unit.position_x
-            dy = target_y - unit.position_y
-            distance_to_target = math.hypot(dx, dy)
-            if distance_to_target < 10:
-                # Stop if close to target
+            # Dead reckoning: steer for the bearing of the last plan; the target is
+            # fixed, so it only drifts slowly until the next re-plan
+            if unit.ai_stopped:
                 return 0, 0
-            angle_to_target = math.degrees(math.atan2(dx, dy))
-            angle_diff = (angle_to_target - unit.direction + 360) % 360
+            angle_diff = (unit.ai_bearing - unit.direction + 360) % 360
             if angle_diff > 180:
                 angle_diff -= 360
             # Smooth turning: scale rotation by angle difference
@@ -197,27 +445,25 @@ class GameWindow(PandaWindow):
                 direction += unit.rotation_speed
             return acceleration, direction
 
-        for index, unit in enumerate(self.units):
-            # acceleration, direction = 0, 0
-            # if unit.autonomous:
-            #     acceleration, direction = autonomous_input(unit)
-
-            # if index == self.selected_unit_index:
-            #     if not unit.autonomous:
-            #         acceleration, direction = manual_input(unit)
+        planned = self.ai_scheduler.due(self.units)
+        for unit in planned:
+            self._plan_unit(unit)
+        self.stats["ai_plans"] = len(planned)
 
+        for unit in self.units:
             acceleration, direction = 0, 0
 
             # If selected, check for autonomous activation/deactivation and prioritize manual input
-            if index == self.selected_unit_index:
+            if unit.handle == self.selected_unit_handle:
                 detect_autonomous_activation(unit)
                 detect_autonomous_deactivation(unit, True)
+                detect_patrol_toggle(unit)
                 if not unit.autonomous:
                     acceleration, direction = manual_input(unit)
             # If autonomous is active and not manually controlled, use autonomous input
             if unit.autonomous:
                 # Only use autonomous if not selected or selected but not manually controlling
-                if index != self.selected_unit_index or (index == self.selected_unit_index and acceleration == 0 and direction == 0):
+                if unit.handle != self.selected_unit_handle or (unit.handle == self.selected_unit_handle and acceleration == 0 and direction == 0):
                     acceleration, direction = autonomous_input(unit)
 
 
@@ -225,9 +471,29 @@ class GameWindow(PandaWindow):
             unit.velocity_rotation += direction * self.deltatime
             unit.velocity_x += math.sin(math.radians(unit.direction)) * acceleration * self.deltatime
             unit.velocity_y += math.cos(math.radians(unit.direction)) * acceleration * self.deltatime
+        self.order_button_last_frame = self.mousedownsecondary
+        self.patrol_key_last_frame = self.keydown(Key.P)
+
+    def _plan_unit(self, unit):
+        """Re-plan an autonomous unit: advance its waypoint queue and refresh the bearing it steers for."""
+        if not unit.autonomous:
+            return
+        dx = unit.autonomous_target_x - unit.position_x
+        dy = unit.autonomous_target_y - unit.position_y
+        if dx * dx + dy * dy < self.waypoint_arrive_distance ** 2 and self.waypoints.length(unit.handle) > 1:
+            unit.autonomous_target_x, unit.autonomous_target_y = self.waypoints.advance(unit.handle)
+            dx = unit.autonomous_target_x - unit.position_x
+            dy = unit.autonomous_target_y - unit.position_y
+        # Stop if close to target
+        unit.ai_stopped = math.hypot(dx, dy) < self.waypoint_stop_distance
+        unit.ai_bearing = math.degrees(math.atan2(dx, dy))
 
     def _update_unit_movement(self):
-        for index, unit in enumerate(self.units):
+        if self.terrain and self.units:
+            # Masks load in the background; ask for them before ships reach their chunks
+            self.terrain.prefetch_masks([unit.position_x for unit in self.units],
+                                        [unit.position_y for unit in self.units])
+        for unit in self.units:
             # Apply friction
             unit.velocity_x *= unit.friction
             unit.velocity_y *= unit.friction
@@ -235,91 +501,260 @@ class GameWindow(PandaWindow):
             
             # Update position and direction
             unit.direction += unit.velocity_rotation * self.deltatime
-            unit.position_x += unit.velocity_x * self.deltatime
-            unit.position_y += unit.velocity_y * self.deltatime
+            new_x = unit.position_x + unit.velocity_x * self.deltatime
+            new_y = unit.position_y + unit.velocity_y * self.deltatime
+            if self.terrain and self.terrain.is_blocked(new_x, new_y):
+                # Ran aground, or the chunk's mask is still loading: stop instead of entering it
+                unit.velocity_x = 0
+                unit.velocity_y = 0
+            else:
+                unit.position_x = new_x
+                unit.position_y = new_y
+            self.team_registry.move(unit)
+            unit.sync_node()
+        self._unit_positions_cache = None
 
 
-    def draw(self):
-        """Draw all game elements and UI panels."""
-        self.clear(Color(0, 0, 0))  # Clear screen each frame
-        self._draw_water_background()
-        self._draw_units()
-        self._draw_ui_panels()
-        self._draw_text()
-        self._draw_team_info()
+    def _update_targeting(self):
+        self.targeting.update(self.units, self.team_registry.team_id, self._can_see)
 
-    def _draw_water_background(self):
-        camera_zoom = self.camera_zoom
-        scale = self.water_image_scale * self.extension.scale * camera_zoom
-        width = self.water_image.get_width()
-        height = self.water_image.get_height()
-        tile_w = width * scale - 1 # Subtract 1 to prevent gaps
-        tile_h = height * scale - 1
-
-        # Use configurable variables
-        filter = Color(200, 200, 200, 255)
-        offset_x = self.camera_position_x * self.extension.scale * camera_zoom
-        offset_y = self.camera_position_y * self.extension.scale * camera_zoom
-
-        # Offset shrinks as you zoom out
-        offset_x = offset_x * camera_zoom * self.extension.scale
-        offset_y = offset_y * camera_zoom * self.extension.scale
+    def _can_see(self, team_id, unit):
+        return self.visibility.is_visible(team_id, unit.position_x, unit.position_y)
 
-        # Modulo offset to ensure seamless tiling
-        offset_x = offset_x % tile_w
-        offset_y = offset_y % tile_h
+    def _update_weapons(self):
+        for unit in self.units:
+            unit.reload_timer = max(0, unit.reload_timer - self.deltatime)
+            if unit.handle == self.selected_unit_handle and self.keydown(Key.SPACE) and unit.reload_timer == 0:
+                target_x, target_y = self.camera.screen_to_world(self.mousex, self.mousey)
+                self._fire_salvo(unit, target_x, target_y)
+
+    def _fire_salvo(self, unit, target_x, target_y):
+        unit.target_position_x = target_x
+        unit.target_position_y = target_y
+        unit.gun_direction = math.degrees(math.atan2(target_x - unit.position_x, target_y - unit.position_y))
+        unit.reload_timer = unit.reload_time
+        team_id = self.team_registry.team_id(unit.team)
+        lifetime = unit.weapon_range / unit.projectile_speed
+        # Guns fan out evenly around the aim direction
+        angles = np.radians(unit.gun_direction + (np.arange(unit.guns) - (unit.guns - 1) / 2) * self.salvo_spread)
+        self.projectiles.fire_salvo(
+            np.full(unit.guns, unit.position_x),
+            np.full(unit.guns, unit.position_y),
+            np.sin(angles) * unit.projectile_speed,
+            np.cos(angles) * unit.projectile_speed,
+            lifetime,
+            team_id,
+            unit.attack
+        )
 
-        # Calculate tiling bounds to always cover screen
-        x_start = offset_x - tile_w + self.screen_left
-        y_start = offset_y - tile_h + self.screen_bottom
-        x_end = self.screen_right
-        y_end = self.screen_top
-        cols = int(math.ceil((x_end - x_start) / tile_w)) + 1
-        rows = int(math.ceil((y_end - y_start) / tile_h)) + 1
+    def _update_projectiles(self):
+        self.projectiles.update(self.deltatime)
+        if self.projectiles.count == 0 or not self.units:
+            return
+        damage = self.projectiles.resolve_hits(
+            np.array([unit.position_x for unit in self.units], dtype=np.float32),
+            np.array([unit.position_y for unit in self.units], dtype=np.float32),
+            np.array([unit.radius for unit in self.units], dtype=np.float32),
+            np.array([self.team_registry.team_id(unit.team) for unit in self.units], dtype=np.int32),
+            np.array([unit.defense for unit in self.units], dtype=np.float32),
+        )
+        for unit, taken in zip(self.units, damage):
+            if taken > 0:
+                self.team_registry.damage(unit, float(taken))
+                self._on_unit_damaged(unit, float(taken))
+        self._remove_sunk_units()
 
-        for col in range(cols):
-            for row in range(rows):
-                x = x_start + col * tile_w
-                y = y_start + row * tile_h
-                self.draw_image(
-                    self.water_image,
-                    x,
-                    y,
-                    anchor=Anchor.BOTTOMLEFT,
-                    xscale=scale,
-                    yscale=scale,
-                    filter=filter,
-                    rotation=0
-                )
+    def _update_visibility(self):
+        for unit in self.units:
+            self.visibility.update_unit(unit, self.team_registry.team_id(unit.team), unit.position_x, unit.position_y, unit.vision_range)
 
+    def _update_clusters(self):
+        for unit in self.units:
+            self.clusters.update_unit(unit, self.team_registry.team_id(unit.team), unit.position_x, unit.position_y)
+
+    def is_visible_to(self, team, x, y):
+        """Return True if a world point is inside the given team's vision."""
+        return self.visibility.is_visible(self.team_registry.team_id(team), x, y)
+
+    def _sync_simulation(self):
+        # Forward this frame's input, then mirror the newest tick the child has published
+        self.simulation.send_input({
+            "keys": [name for name in SIM_KEYS if self.keydown(Key[name])],
+            "mouse": (self.mousex, self.mousey),
+            "buttons": (self.mousedownprimary, self.mousedownmiddle, self.mousedownsecondary),
+            "camera": (self.camera.x, self.camera.y, self.camera.zoom, self.camera.scale, self.width, self.height),
+        })
+        snapshot = self.simulation.read()
+        if snapshot is None or snapshot.tick == self.simulation_tick:
+            if not self.simulation.alive:
+                raise RuntimeError("simulation process exited; see its traceback above")
+            return
+        elapsed = (snapshot.tick - self.simulation_tick) / TICK_RATE
+        self.simulation_tick = snapshot.tick
+        self._apply_snapshot(snapshot, elapsed)
+        self._update_visibility()
+        self.stats["sim_tick_ms"] = snapshot.tick_ms
+
+    def _apply_snapshot(self, snapshot, elapsed):
+        known = {unit.id: unit for unit in self.units}
+        selected = NO_HANDLE
+        for unit_id, kind, team_index, x, y, direction, health, target_x, target_y, autonomous in snapshot.units.tolist():
+            team = self.teams[team_index]
+            unit = known.pop(unit_id, None)
+            if unit is None:
+                unit = unit_class(kind)(team, x, y, direction)
+                unit.id = unit_id
+                self.spawn_unit(unit)
+            elif unit.team is not team:
+                self.team_registry.change_team(unit, team)
+                unit.arrow_node.filter = team.color
+            # Mirrors only get positions; estimate velocity for effects such as wakes
+            unit.velocity_x = (x - unit.position_x) / elapsed
+            unit.velocity_y = (y - unit.position_y) / elapsed
+            unit.position_x, unit.position_y, unit.direction = x, y, direction
+            unit.autonomous_target_x, unit.autonomous_target_y, unit.autonomous = target_x, target_y, autonomous
+            if unit.health != health:
+                self._on_unit_damaged(unit, unit.health - health)
+                self.team_registry.damage(unit, unit.health - health)
+            self.team_registry.move(unit)
+            unit.sync_node()
+            if unit_id == snapshot.selected_id:
+                selected = unit.handle
+        for unit in known.values():
+            self._on_unit_sunk(unit)
+            self.despawn_unit(unit)
+        # Only the selected unit's orders are published; mirror them for the path overlay
+        self.waypoints.clear(self.selected_unit_handle)
+        self.waypoints.clear(selected)
+        for x, y in snapshot.waypoints.tolist():
+            self.waypoints.append(selected, x, y)
+        self.waypoints.set_patrol(selected, snapshot.patrol)
+        self.selected_unit_handle = selected
+        self.projectile_positions = (snapshot.projectile_x, snapshot.projectile_y)
+        self._unit_positions_cache = None
+
+    def _update_effects(self):
+        emit_wakes(self.particles, self.units, self.deltatime)
+        self.particles.update(self.deltatime)
+
+    def _on_unit_damaged(self, unit, amount):
+        count = min(24, 4 + int(amount / 20))
+        self.particles.burst(unit.position_x, unit.position_y, count, 90, 0.7, 12, self.fire_color, radius=unit.radius * 0.3)
+        self.particles.burst(unit.position_x, unit.position_y, count // 2, 40, 1.5, 14, self.smoke_color,
+                             radius=unit.radius * 0.3, growth=10)
+
+    def _on_unit_sunk(self, unit):
+        self.particles.burst(unit.position_x, unit.position_y, 60, 160, 1.0, 18, self.fire_color, radius=unit.radius * 0.6)
+        self.particles.burst(unit.position_x, unit.position_y, 40, 60, 2.5, 20, self.smoke_color,
+                             radius=unit.radius * 0.6, growth=15)
+
+    def _remove_sunk_units(self):
+        if all(unit.alive for unit in self.units):
+            return
+        # A sunk selected unit leaves a stale handle, which selects nothing
+        for unit in [unit for unit in self.units if not unit.alive]:
+            self._on_unit_sunk(unit)
+            self.despawn_unit(unit)
 
-        camera_zoom = self.camera_zoom
-        scale = self.water_image_scale * self.extension.scale * camera_zoom
-        width = self.water_image.get_width()
-        height = self.water_image.get_height()
-        tile_w = width * scale - 1 # Subtract 1 to prevent gaps
-        tile_h = height * scale - 1
+    def draw(self):
+        """Draw all game elements and UI panels."""
+        # World layers may render at reduced resolution; the HUD stays native
+        self.world_render_scale = self.quality.get("world_render_scale", 1.0)
+        with self.world_layer():
+            self.clear(Color(0, 0, 0))  # Clear screen each frame
+            self._draw_water_background()
+            self._draw_terrain()
+            if self.strategic_view:
+                self._draw_clusters()
+            else:
+                self._draw_units()
+            self._draw_particles()
+            self._draw_projectiles()
+        self._draw_hud()
+
+    def _draw_hud(self):
+        # Redraw the HUD into a cached layer every few frames when the quality tier asks for it
+        interval = self.quality.get("hud_interval", 1)
+        if interval <= 1:
+            self._draw_hud_layers()
+            return
+        if self.hud_layer is None or self.hud_layer.get_size() != (self.width, self.height):
+            self.hud_layer = self.new_layer()
+            self.hud_frame = 0
+        if self.hud_frame % interval == 0:
+            self.hud_layer.fill((0, 0, 0, 0))
+            with self.render_target(self.hud_layer):
+                self._draw_hud_layers()
+        self.hud_frame += 1
+        self.blit_layer(self.hud_layer)
+
+    def _draw_hud_layers(self):
+        self._draw_ui_panels()
+        self._draw_text()
+        self._draw_team_info()
 
-        # Use configurable variables
-        filter = Color(150, 150, 150, 120)
-        offset_x = self.camera_position_x * self.extension.scale * camera_zoom
-        offset_y = self.camera_position_y * self.extension.scale * camera_zoom
+    def _draw_water_background(self):
+        layers = self.quality.get("water_layers", len(self.water_layer_filters))
+        filters = self.water_layer_filters[:layers]
+        scale = self.water_image_scale * self.camera.factor
+        tile_w = self.water_image.get_width() * scale - 1  # Subtract 1 to prevent gaps
+        tile_h = self.water_image.get_height() * scale - 1
 
-        # Offset shrinks as you zoom out
-        offset_x = offset_x * camera_zoom * self.extension.scale
-        offset_y = offset_y * camera_zoom * self.extension.scale
+        # Screen position of the world origin, so the water moves with the world
+        offset_x, offset_y = self.camera.world_to_screen(0, 0)
 
         # Modulo offset to ensure seamless tiling
         offset_x = offset_x % tile_w
         offset_y = offset_y % tile_h
 
-        # Calculate tiling bounds to always cover screen
-        x_start = offset_x - tile_w + self.screen_left
-        y_start = offset_y - tile_h + self.screen_bottom
-        x_end = self.screen_right
-        y_end = self.screen_top
-        cols = int(math.ceil((x_end - x_start) / tile_w)) + 1
-        rows = int(math.ceil((y_end - y_start) / tile_h)) + 1
+        key = (scale, tuple(filter.to_tuple() for filter in filters), self.screen.get_size(),
+               self.world_render_scale, self.quality.tier)
+        if key != self.water_sheet_key:
+            # Still zooming or resizing: tile directly and build the sheet once the key settles
+            self.water_sheet_key = key
+            self.water_sheet = None
+        elif self.water_sheet is None:
+            self.water_sheet = self._build_water_sheet(filters, tile_w, tile_h)
+        if self.water_sheet is None:
+            bounds = (self.screen_left, self.screen_bottom, self.screen_right, self.screen_top)
+            for filter in filters:
+                self._draw_water_layer(filter, offset_x, offset_y, tile_w, tile_h, bounds)
+            return
+        # The sheet reaches one tile past the screen's right and bottom edges; shifting it
+        # back by the offset lines its tiles up with the world
+        self.blit_layer(self.water_sheet,
+                        self.panda2d_to_pygame(self.screen_left + offset_x - tile_w, self.screen_top + offset_y))
+
+    def _build_water_sheet(self, filters, tile_w, tile_h):
+        """Composite the water layers into an opaque surface one tile larger than the screen.
+
+        The translucent layers are blended once here, so the water costs one
+        opaque blit per frame instead of one blit per tile and layer.
+        Returns None when the sheet would exceed water_sheet_max_ratio times
+        the target's area; the tiles are then few enough to draw directly.
+        """
+        bounds = (self.screen_left, self.screen_bottom - tile_h, self.screen_right + tile_w, self.screen_top)
+        left, top = self.panda2d_to_pygame(bounds[0], bounds[3])
+        right, bottom = self.panda2d_to_pygame(bounds[2], bounds[1])
+        target_w, target_h = self.screen.get_size()
+        size = (right - left + 1, bottom - top + 1)
+        if size[0] * size[1] > self.water_sheet_max_ratio * target_w * target_h:
+            return None
+        sheet = self.new_layer(size, opaque=True)
+        with self.render_target(sheet, origin=(left, top)):
+            self.clear(Color(0, 0, 0))
+            for filter in filters:
+                self._draw_water_layer(filter, 0, 0, tile_w, tile_h, bounds)
+        return sheet
+
+    def _draw_water_layer(self, filter: Color, offset_x, offset_y, tile_w, tile_h, bounds):
+        """Tile one water layer over bounds (left, bottom, right, top), starting one tile before the offset."""
+        scale = self.water_image_scale * self.camera.factor
+        left, bottom, right, top = bounds
+        x_start = offset_x - tile_w + left
+        y_start = offset_y - tile_h + bottom
+        cols = int(math.ceil((right - x_start) / tile_w)) + 1
+        rows = int(math.ceil((top - y_start) / tile_h)) + 1
 
         for col in range(cols):
             for row in range(rows):
@@ -335,79 +770,133 @@ class GameWindow(PandaWindow):
                     filter=filter,
                     rotation=0
                 )
-                    
 
+    def _draw_terrain(self):
+        if not self.terrain:
+            return
+        factor = self.camera.factor
+        for chunk in self.terrain.visible_chunks(self.camera.visible_world_rect()):
+            image = chunk.image
+            x, y = self.camera.world_to_screen(*self.terrain.chunk_center(chunk))
+            scale = self.terrain.chunk_size * factor / image.get_width()
+            self.draw_image(image, x, y, anchor=Anchor.CENTER, xscale=scale, yscale=scale)
 
     def _draw_units(self):
-        # Calculate mouse position in world coordinates
-        mouse_world_x = (self.mousex - self.screen_center_x) / (self.extension.scale * self.camera_zoom) - self.camera_position_x
-        mouse_world_y = (self.mousey - self.screen_center_y) / (self.extension.scale * self.camera_zoom) - self.camera_position_y
-        closest_unit_index = -1
-        closest_distance = float('inf')
-        for index, unit in enumerate(self.units):
-            dist = distance(unit.position_x, unit.position_y, mouse_world_x, mouse_world_y)
-            if dist < closest_distance:
-                closest_distance = dist
-                closest_unit_index = index
-        unit_index = -1
-        for unit in self.units:
-            unit_index += 1
-            screen_x = self.screen_center_x + (unit.position_x + self.camera_position_x) * self.extension.scale * self.camera_zoom
-            screen_y = self.screen_center_y + (unit.position_y + self.camera_position_y) * self.extension.scale * self.camera_zoom
-            if unit_index == self.selected_unit_index:
-                self.draw_image(
-                    unit.image,
-                    screen_x,
-                    screen_y,
-                    anchor=Anchor.CENTER,
-                    xscale=self.extension.scale * self.camera_zoom,
-                    yscale=self.extension.scale * self.camera_zoom,
-                    filter=Color(255, 255, 255, 255),
-                    rotation=unit.direction
-                )
-
+        # Hover uses the same picking as selection, redone only when the mouse or camera moves
+        hover_key = (self.mousex, self.mousey, self.camera.x, self.camera.y, self.camera.zoom, self.camera.scale)
+        if hover_key != self._hover_key:
+            self._hover_key = hover_key
+            self.hovered_unit_handle = self.pick_unit(*self.camera.screen_to_world(self.mousex, self.mousey))
+        hovered_unit_handle = self.hovered_unit_handle
+        factor = self.camera.factor
+        lod_pixels = self.quality.get("sprite_lod_pixels", 0)
+        if self.fog_team is None:
+            visible = [True] * len(self.units)
+        else:
+            visible = self.visibility.visible_mask(
+                self.team_registry.team_id(self.fog_team),
+                [unit.position_x for unit in self.units],
+                [unit.position_y for unit in self.units],
+            )
+        arrow_shown = self.selection_arrow_image.get_height() * factor * 0.05 >= lod_pixels
+        dots_x, dots_y, dot_colors = [], [], []
+        # Only per-frame flags change here; transforms are cached in the scene graph
+        for unit_index, unit in enumerate(self.units):
+            node = unit.node
+            shown = bool(visible[unit_index])
+            too_small = unit.image.get_height() * factor < lod_pixels
+            node.visible = shown and not too_small
+            # Assigned once per frame: toggling visibility makes the scene rebuild its draw list
+            unit.target_node.visible = (shown and not too_small and unit.autonomous
+                                        and unit.handle == self.selected_unit_handle)
+            if not shown:
+                continue
+            if too_small:
+                # Too small to read: draw a team-colored dot instead of the sprite and arrow
+                dots_x.append(unit.position_x)
+                dots_y.append(unit.position_y)
+                dot_colors.append(unit.team.color)
+                continue
+            unit.arrow_node.visible = arrow_shown
+            if unit.handle == self.selected_unit_handle:
+                node.filter = Color(255, 255, 255, 255)
                 if unit.autonomous:
-                    self.draw_image(
-                        self.target_image,
-                        self.screen_center_x + (unit.autonomous_target_x + self.camera_position_x) * self.extension.scale * self.camera_zoom,
-                        self.screen_center_y + (unit.autonomous_target_y + self.camera_position_y) * self.extension.scale * self.camera_zoom,
-                        anchor=Anchor.CENTER,
-                        xscale=0.05 * self.extension.scale * self.camera_zoom,
-                        yscale=0.05 * self.extension.scale * self.camera_zoom,
-                        rotation=0
-                    )
-            elif unit_index == closest_unit_index and closest_distance < self.unit_select_distance:
-                self.draw_image(
-                    unit.image,
-                    screen_x,
-                    screen_y,
-                    anchor=Anchor.CENTER,
-                    xscale=self.extension.scale * self.camera_zoom,
-                    yscale=self.extension.scale * self.camera_zoom,
-                    filter=Color(200, 200, 200, 255),
-                    rotation=unit.direction
-                )
+                    unit.target_node.set_transform(unit.autonomous_target_x, unit.autonomous_target_y)
+                    self._draw_waypoint_path(unit)
+            elif unit.handle == hovered_unit_handle:
+                node.filter = Color(200, 200, 200, 255)
             else:
-                self.draw_image(
-                    unit.image,
-                    screen_x,
-                    screen_y,
-                    anchor=Anchor.CENTER,
-                    xscale=self.extension.scale * self.camera_zoom,
-                    yscale=self.extension.scale * self.camera_zoom,
-                    filter=Color(150, 150, 150, 255),
-                    rotation=unit.direction
-                )
-            self.draw_image(
-                self.selection_arrow_image,
-                screen_x,
-                screen_y + 150 * self.extension.scale * self.camera_zoom,
-                anchor=Anchor.CENTER,
-                xscale=self.extension.scale * self.camera_zoom * 0.05,
-                yscale=self.extension.scale * self.camera_zoom * 0.05,
-                filter=unit.team.color,
-                rotation=0
-            )
+                node.filter = Color(150, 150, 150, 255)
+        if dots_x:
+            screen_xs, screen_ys = self.camera.world_to_screen_array(dots_x, dots_y)
+            for x, y, color in zip(screen_xs.tolist(), screen_ys.tolist(), dot_colors):
+                self.fill_rect(x - 2, y - 2, x + 2, y + 2, color)
+        self.draw_scene(self.scene)
+
+    def _draw_projectiles(self):
+        xs, ys = self.projectile_positions if self.simulation is not None else self.projectiles.live()
+        if len(xs) == 0:
+            return
+        visible = self.camera.visible_mask(xs, ys)
+        screen_xs, screen_ys = self.camera.world_to_screen_array(xs[visible], ys[visible])
+        self.draw_points(screen_xs, screen_ys, self.projectile_color, size=max(2, 6 * self.camera.factor))
+
+    def _draw_waypoint_path(self, unit):
+        """Draw the selected unit's course through its queued waypoints."""
+        points = self.waypoints.points(unit.handle)
+        if len(points) < 2:
+            return
+        if self.waypoints.patrolling(unit.handle):
+            points.append(points[0])
+        xs, ys = zip(*([(unit.position_x, unit.position_y)] + points))
+        screen_xs, screen_ys = self.camera.world_to_screen_array(xs, ys)
+        screen_xs, screen_ys = screen_xs.tolist(), screen_ys.tolist()
+        for i in range(len(screen_xs) - 1):
+            self.draw_line(screen_xs[i], screen_ys[i], screen_xs[i + 1], screen_ys[i + 1], self.waypoint_path_color)
+
+    def _draw_clusters(self):
+        # One icon and count per cluster, so the cost follows clusters on screen rather than units
+        level = self.clusters.level_for(self.camera.factor, self.cluster_pixels)
+        clusters = list(self.clusters.clusters(level, self.camera.visible_world_rect()))
+        if self.fog_team is not None:
+            fog_team = self.team_registry.team_id(self.fog_team)
+            clusters = [
+                cluster for cluster in clusters
+                if cluster[0] == fog_team or self.visibility.is_visible(fog_team, cluster[2], cluster[3])
+            ]
+        if not clusters:
+            return
+        screen_xs, screen_ys = self.camera.world_to_screen_array(
+            [cluster[2] for cluster in clusters], [cluster[3] for cluster in clusters])
+        icon_size = self.cluster_icon_pixels * self.extension.scale
+        icon_scale = icon_size / self.selection_arrow_image.get_width()
+        for (team, count, _, _), x, y in zip(clusters, screen_xs.tolist(), screen_ys.tolist()):
+            self.draw_image(self.selection_arrow_image, x, y, anchor=Anchor.CENTER, xscale=icon_scale,
+                            yscale=icon_scale, filter=self.teams[team].color)
+            if count > 1:
+                self.draw_image(self._cluster_label(count), x, y - icon_size / 2, anchor=Anchor.TOP)
+
+    def _cluster_label(self, count):
+        key = (count, self.extension.scale)
+        label = self.cluster_labels.get(key)
+        if label is None:
+            if len(self.cluster_labels) > 256:
+                self.cluster_labels.clear()
+            font = self.context_font.new_size(14 * self.extension.scale)
+            label = self.cluster_labels[key] = self.render_text(str(count), font, Color(255, 255, 255))
+        return label
+
+    def _draw_particles(self):
+        if self.particles.count == 0:
+            return
+        xs, ys, sizes, colors, alphas = self.particles.live()
+        visible = self.camera.visible_mask(xs, ys, sizes)
+        if self.fog_team is not None:
+            # Wakes and fires would give away ships hidden by the fog
+            visible &= self.visibility.visible_mask(self.team_registry.team_id(self.fog_team), xs, ys)
+        screen_xs, screen_ys = self.camera.world_to_screen_array(xs[visible], ys[visible])
+        self.draw_particles(screen_xs, screen_ys, sizes[visible] * self.camera.factor, self.particle_palette,
+                            colors[visible], alphas[visible])
 
     def _draw_ui_panels(self):
         # Left side panel
@@ -478,17 +967,22 @@ class GameWindow(PandaWindow):
         self.draw_text("Fleet Command", font, title_x, title_y, anchor, self.title_text_color)
 
     def _draw_team_info(self):
-        team_font = self.context_font.new_size(14 * self.extension.scale)
+        # Re-render the team labels only when the counts or the UI scale change
+        key = (self.team_registry.version, self.extension.scale)
+        if key != self.team_info_key:
+            team_font = self.context_font.new_size(14 * self.extension.scale)
+            self.team_info_images = [
+                self.render_text(f"{team.name} - {self.team_registry.count(team)}", team_font, team.color)
+                for team in self.teams
+            ]
+            self.team_info_key = key
         height_change = 20
         height_offset = 110
-        for team in self.teams:
-            team_units = [unit for unit in self.units if unit.team == team]
-            self.draw_text(
-                text=f"{team.name} - {len(team_units)}",
-                font=team_font,
+        for image in self.team_info_images:
+            self.draw_image(
+                image,
                 x=self.extension.extend(self.screen_right, 75, ExtendMethod.LEFT),
                 y=self.extension.extend(self.screen_bottom, height_offset, ExtendMethod.UP),
                 anchor=Anchor.BOTTOM,
-                color=team.color,
             )
             height_offset += height_change
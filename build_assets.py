@@ -0,0 +1,29 @@
+"""Build the pre-decoded asset pack loaded by GameWindow at startup.
+
+Usage:
+    python build_assets.py [assets_dir] [output]
+"""
+import os
+import sys
+
+from panda2d import build_asset_pack, PACK_IMAGE_EXTENSIONS, PACK_FONT_EXTENSIONS
+
+DEFAULT_ASSETS_DIR = "assets"
+DEFAULT_OUTPUT = "assets/assets.pack"
+
+
+def collect_assets(root: str):
+    """Return the image and font files under root, in a stable order."""
+    paths = []
+    for directory, _, files in os.walk(root):
+        for name in sorted(files):
+            if name.lower().endswith(PACK_IMAGE_EXTENSIONS + PACK_FONT_EXTENSIONS):
+                paths.append(os.path.join(directory, name))
+    return sorted(paths)
+
+
+if __name__ == "__main__":
+    assets_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ASSETS_DIR
+    output = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_OUTPUT
+    index = build_asset_pack(output, collect_assets(assets_dir))
+    print(f"Packed {len(index)} assets into {output}")
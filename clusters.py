@@ -0,0 +1,71 @@
+class ClusterGrid:
+    """Hierarchical per-team grid of unit counts for strategic-zoom rendering.
+
+    Level 0 cells are base_cell world units wide and every level above
+    doubles the cell size. Each occupied cell keeps a unit count and the
+    sum of its units' positions, for a centroid. Like VisibilityGrid, a
+    unit only touches the hierarchy when it crosses a base cell boundary.
+    The stored position is where it entered the cell, so centroids are off
+    by at most a base cell, which is invisible at strategic zoom.
+    """
+
+    def __init__(self, team_count: int, base_cell: float = 200, levels: int = 8):
+        self.base_cell = base_cell
+        self.levels = levels
+        # levels[level][team] -> {(cell_x, cell_y): [count, sum_x, sum_y]}
+        self._cells = [[{} for _ in range(team_count)] for _ in range(levels)]
+        self._units = {}  # unit -> (team, cell_x, cell_y, x, y) as last recorded
+
+    def _apply(self, team, cell_x, cell_y, x, y, sign):
+        for level in range(self.levels):
+            cells = self._cells[level][team]
+            key = (cell_x >> level, cell_y >> level)
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = [0, 0.0, 0.0]
+            cell[0] += sign
+            cell[1] += sign * x
+            cell[2] += sign * y
+            if cell[0] == 0:
+                del cells[key]
+
+    def update_unit(self, unit, team: int, x: float, y: float):
+        """Record a unit's position; does nothing unless it changed base cell or team."""
+        cell_x, cell_y = int(x // self.base_cell), int(y // self.base_cell)
+        previous = self._units.get(unit)
+        if previous is not None:
+            if previous[:3] == (team, cell_x, cell_y):
+                return False
+            self._apply(*previous, -1)
+        self._apply(team, cell_x, cell_y, x, y, 1)
+        self._units[unit] = (team, cell_x, cell_y, x, y)
+        return True
+
+    def remove_unit(self, unit):
+        previous = self._units.pop(unit, None)
+        if previous is not None:
+            self._apply(*previous, -1)
+
+    def level_for(self, pixels_per_unit: float, cluster_pixels: float) -> int:
+        """Return the lowest level whose cells are at least cluster_pixels wide on screen."""
+        size = self.base_cell * pixels_per_unit
+        level = 0
+        while size < cluster_pixels and level < self.levels - 1:
+            size *= 2
+            level += 1
+        return level
+
+    def clusters(self, level: int, rect=None):
+        """Yield (team, count, centroid_x, centroid_y) for the occupied cells of a level.
+
+        rect is an optional (left, bottom, right, top) world rect; only cells
+        overlapping it are returned.
+        """
+        size = self.base_cell * (1 << level)
+        for team, cells in enumerate(self._cells[level]):
+            for (cell_x, cell_y), (count, sum_x, sum_y) in cells.items():
+                if rect is not None and (
+                        (cell_x + 1) * size < rect[0] or cell_x * size > rect[2]
+                        or (cell_y + 1) * size < rect[1] or cell_y * size > rect[3]):
+                    continue
+                yield team, count, sum_x / count, sum_y / count
@@ -0,0 +1,85 @@
+NO_HANDLE = -1
+
+_SLOT_BITS = 32
+_SLOT_MASK = (1 << _SLOT_BITS) - 1
+
+
+class EntityRegistry:
+    """Slot map of live entities addressed by generational handles.
+
+    A handle packs a slot index with the slot's generation. Despawning
+    bumps the generation, so stale handles stop resolving instead of
+    pointing at whichever entity reuses the slot. Live entities are kept
+    densely in items for iteration; despawn swaps the last entity into the
+    hole, so spawn and despawn are O(1) and iteration order is not stable.
+    """
+
+    def __init__(self):
+        self.items = []  # Live entities, densely packed
+        self._item_slots = []  # Slot of each entry in items
+        self._slot_items = []  # Index into items per slot, -1 when free
+        self._generations = []
+        self._free = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def spawn(self, item) -> int:
+        """Store an entity and return its handle."""
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._generations)
+            self._generations.append(0)
+            self._slot_items.append(-1)
+        self._slot_items[slot] = len(self.items)
+        self.items.append(item)
+        self._item_slots.append(slot)
+        return (self._generations[slot] << _SLOT_BITS) | slot
+
+    def _slot(self, handle: int) -> int:
+        if handle < 0:
+            return -1
+        slot = handle & _SLOT_MASK
+        if slot >= len(self._generations) or self._generations[slot] != handle >> _SLOT_BITS:
+            return -1
+        return slot if self._slot_items[slot] >= 0 else -1
+
+    def contains(self, handle: int) -> bool:
+        return self._slot(handle) >= 0
+
+    def get(self, handle: int):
+        """Return the entity for a handle, or None when it is stale or NO_HANDLE."""
+        slot = self._slot(handle)
+        return self.items[self._slot_items[slot]] if slot >= 0 else None
+
+    def despawn(self, handle: int):
+        """Remove an entity; return it, or None when the handle is stale."""
+        slot = self._slot(handle)
+        if slot < 0:
+            return None
+        index = self._slot_items[slot]
+        item = self.items[index]
+        last = self.items.pop()
+        last_slot = self._item_slots.pop()
+        if index < len(self.items):
+            # Fill the hole with the last entity
+            self.items[index] = last
+            self._item_slots[index] = last_slot
+            self._slot_items[last_slot] = index
+        self._slot_items[slot] = -1
+        self._generations[slot] += 1
+        self._free.append(slot)
+        return item
+
+    def clear(self):
+        """Despawn everything; outstanding handles all become stale."""
+        for slot in self._item_slots:
+            self._slot_items[slot] = -1
+            self._generations[slot] += 1
+            self._free.append(slot)
+        self.items = []
+        self._item_slots = []
@@ -1,5 +1,8 @@
+import sys
+
 from app import GameWindow
 
 if __name__ == "__main__":
-    window = GameWindow()
+    # --split runs the simulation in its own process, overlapping it with rendering
+    window = GameWindow(split_simulation="--split" in sys.argv)
     window.start()
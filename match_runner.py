@@ -0,0 +1,182 @@
+"""Run headless AI-vs-AI matches in parallel for balance and load testing.
+
+Usage:
+    python match_runner.py scenarios/skirmish.json --matches 100 --ticks 6000 --out report
+
+Each match runs a GameWindow simulation without a display in a worker
+process. Results stream back as matches finish and are aggregated into
+<out>.csv (one row per match) and <out>.json (summary plus all rows).
+"""
+import argparse
+import csv
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+
+TICK_RATE = 60
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _init_worker():
+    # Must run before pygame is imported in the worker
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    # SDL would otherwise trap SIGTERM, and Pool.terminate() could never stop the worker
+    os.environ["SDL_NO_SIGNAL_HANDLERS"] = "1"
+    # Game assets are loaded relative to the game directory
+    os.chdir(GAME_DIR)
+
+
+def _make_match_window():
+    import app
+    import units
+
+    class MatchWindow(app.GameWindow):
+        """GameWindow driven by a simple AI at a fixed tick rate, without drawing."""
+
+        def load_scenario(self, scenario, rng):
+            teams = {team.name: team for team in self.teams}
+            jitter = scenario.get("jitter", 0)
+            self.clear_units()
+            for spec in scenario["units"]:
+                unit_class = getattr(units, spec.get("type", "Battleship"))
+                self.spawn_unit(unit_class(
+                    teams[spec["team"]],
+                    spec.get("x", 0) + rng.uniform(-jitter, jitter),
+                    spec.get("y", 0) + rng.uniform(-jitter, jitter),
+                    spec.get("direction", rng.uniform(0, 360)),
+                ))
+
+        def _update_match_ai(self):
+            # Runs after the targeting pass, so the KD-trees are current for this tick
+            for unit in self.units:
+                team = self.team_registry.team_id(unit.team)
+                enemy, _ = self.targeting.nearest_enemy(unit, team)
+                if enemy is None:
+                    continue
+                unit.autonomous = True
+                unit.autonomous_target_x = enemy.position_x
+                unit.autonomous_target_y = enemy.position_y
+                target = unit.target
+                if target is not None and unit.reload_timer == 0 and math.hypot(
+                        target.position_x - unit.position_x,
+                        target.position_y - unit.position_y) < unit.weapon_range * 0.9:
+                    self._fire_salvo(unit, target.position_x, target.position_y)
+
+        def _update_targeting(self):
+            super()._update_targeting()
+            self._update_match_ai()
+
+        def teams_alive(self):
+            return [team for team in self.teams if self.team_registry.count(team) > 0]
+
+    return MatchWindow
+
+
+def run_match(job):
+    """Run one match in a worker; return a flat result dict."""
+    match_id, scenario_path, seed, tick_limit = job
+    with open(scenario_path) as f:
+        scenario = json.load(f)
+    rng = random.Random(seed)
+
+    window = _make_match_window()()
+    window.initialize()
+    window.load_scenario(scenario, rng)
+    window.deltatime = 1.0 / TICK_RATE
+
+    tick_times = []
+    ticks = 0
+    started = time.perf_counter()
+    while ticks < tick_limit and len(window.teams_alive()) > 1:
+        tick_start = time.perf_counter()
+        window.update()
+        tick_times.append(time.perf_counter() - tick_start)
+        ticks += 1
+    wall_time = time.perf_counter() - started
+
+    alive = window.teams_alive()
+    result = {
+        "match": match_id,
+        "seed": seed,
+        "scenario": scenario_path,
+        "ticks": ticks,
+        "winner": alive[0].name if len(alive) == 1 else "draw",
+        "wall_time_s": round(wall_time, 4),
+        "tick_mean_ms": round(1000 * sum(tick_times) / max(1, len(tick_times)), 4),
+        "tick_max_ms": round(1000 * max(tick_times, default=0), 4),
+    }
+    for team in window.teams:
+        result[f"{team.name} units"] = window.team_registry.count(team)
+        result[f"{team.name} health"] = round(window.team_registry.total_health(team), 1)
+    return result
+
+
+def summarize(results, wall_time):
+    winners = {}
+    for result in results:
+        winners[result["winner"]] = winners.get(result["winner"], 0) + 1
+    total_ticks = sum(result["ticks"] for result in results)
+    return {
+        "matches": len(results),
+        "wins": winners,
+        "mean_ticks": total_ticks / max(1, len(results)),
+        "mean_tick_ms": sum(result["tick_mean_ms"] for result in results) / max(1, len(results)),
+        "max_tick_ms": max((result["tick_max_ms"] for result in results), default=0),
+        "wall_time_s": round(wall_time, 3),
+        "matches_per_s": len(results) / wall_time if wall_time else 0,
+        "ticks_per_s": total_ticks / wall_time if wall_time else 0,
+    }
+
+
+def run_matches(scenario_path, matches, tick_limit, seed=0, workers=None, on_result=None):
+    """Run matches across a process pool; return (results, summary)."""
+    scenario_path = os.path.abspath(scenario_path)
+    jobs = [(index, scenario_path, seed + index, tick_limit) for index in range(matches)]
+    results = []
+    started = time.perf_counter()
+    # Spawn keeps workers free of any pygame state the parent may hold
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers or os.cpu_count(), initializer=_init_worker) as pool:
+        for result in pool.imap_unordered(run_match, jobs):
+            results.append(result)
+            if on_result:
+                on_result(result)
+        # Let the workers exit on their own; leaving the block only terminates them
+        pool.close()
+        pool.join()
+    results.sort(key=lambda result: result["match"])
+    return results, summarize(results, time.perf_counter() - started)
+
+
+def write_report(results, summary, out):
+    if results:
+        with open(f"{out}.csv", "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+            writer.writeheader()
+            writer.writerows(results)
+    with open(f"{out}.json", "w") as f:
+        json.dump({"summary": summary, "matches": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenario", help="Scenario JSON file")
+    parser.add_argument("--matches", type=int, default=10)
+    parser.add_argument("--ticks", type=int, default=6000, help="Tick limit per match")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first match; match i uses seed + i")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--out", default="match_report", help="Report path without extension")
+    args = parser.parse_args()
+
+    def progress(result):
+        print(f"match {result['match']}: {result['winner']} in {result['ticks']} ticks "
+              f"({result['tick_mean_ms']:.2f} ms/tick)", flush=True)
+
+    results, summary = run_matches(args.scenario, args.matches, args.ticks, args.seed, args.workers, progress)
+    write_report(results, summary, args.out)
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,155 @@
+import numpy as np
+
+
+class WaypointQueues:
+    """Per-unit waypoint queues sharing one preallocated pool of nodes.
+
+    Waypoints live in NumPy arrays and are chained into singly linked lists
+    through next; free nodes sit on a stack like ProjectilePool's slots, so
+    queuing orders never allocates. Each queue is keyed by a unit handle
+    and its head is the waypoint being steered to. A patrol queue moves
+    each reached waypoint to its back instead of dropping it.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.next = np.full(capacity, -1, dtype=np.int32)
+        self._free = np.arange(capacity - 1, -1, -1, dtype=np.int32)
+        self._free_count = capacity
+        self._queues = {}  # handle -> [head, tail, length, patrol]
+
+    def __len__(self):
+        """Number of queued waypoints across all units."""
+        return self.capacity - self._free_count
+
+    def length(self, handle: int) -> int:
+        queue = self._queues.get(handle)
+        return queue[2] if queue is not None else 0
+
+    def current(self, handle: int):
+        """Return the (x, y) at the head of a unit's queue, or None when it is empty."""
+        queue = self._queues.get(handle)
+        if queue is None:
+            return None
+        node = queue[0]
+        return float(self.x[node]), float(self.y[node])
+
+    def points(self, handle: int):
+        """Return a unit's waypoints in order as a list of (x, y)."""
+        queue = self._queues.get(handle)
+        points = []
+        node = queue[0] if queue is not None else -1
+        while node >= 0:
+            points.append((float(self.x[node]), float(self.y[node])))
+            node = int(self.next[node])
+        return points
+
+    def append(self, handle: int, x: float, y: float) -> bool:
+        """Queue a waypoint behind a unit's others; return False when the pool is full."""
+        if self._free_count == 0:
+            return False
+        self._free_count -= 1
+        node = int(self._free[self._free_count])
+        self.x[node] = x
+        self.y[node] = y
+        self.next[node] = -1
+        queue = self._queues.get(handle)
+        if queue is None:
+            self._queues[handle] = [node, node, 1, False]
+        else:
+            self.next[queue[1]] = node
+            queue[1] = node
+            queue[2] += 1
+        return True
+
+    def set(self, handle: int, x: float, y: float) -> bool:
+        """Replace a unit's queue with a single waypoint, keeping its patrol flag."""
+        patrol = self.patrolling(handle)
+        self.clear(handle)
+        if not self.append(handle, x, y):
+            return False
+        self._queues[handle][3] = patrol
+        return True
+
+    def patrolling(self, handle: int) -> bool:
+        queue = self._queues.get(handle)
+        return queue is not None and queue[3]
+
+    def set_patrol(self, handle: int, patrol: bool):
+        """Make a unit's queue loop (patrol) or run once; does nothing for an empty queue."""
+        queue = self._queues.get(handle)
+        if queue is not None:
+            queue[3] = patrol
+
+    def advance(self, handle: int):
+        """Mark the head waypoint reached; return the new head, or None when the queue ran out."""
+        queue = self._queues.get(handle)
+        if queue is None:
+            return None
+        head, tail, length, patrol = queue
+        if patrol:
+            if length > 1:
+                # Rotate the reached waypoint to the back
+                queue[0] = int(self.next[head])
+                self.next[head] = -1
+                self.next[tail] = head
+                queue[1] = head
+            return self.current(handle)
+        queue[0] = int(self.next[head])
+        queue[2] -= 1
+        self._release(head)
+        if queue[2] == 0:
+            del self._queues[handle]
+            return None
+        return self.current(handle)
+
+    def clear(self, handle: int):
+        """Drop a unit's queue, returning its nodes to the pool."""
+        queue = self._queues.pop(handle, None)
+        node = queue[0] if queue is not None else -1
+        while node >= 0:
+            following = int(self.next[node])
+            self._release(node)
+            node = following
+
+    def _release(self, node: int):
+        self.next[node] = -1
+        self._free[self._free_count] = node
+        self._free_count += 1
+
+
+class PlanScheduler:
+    """Time-slices per-unit AI planning across ticks.
+
+    Like TargetingSystem's stagger, each tick only plans a slice of the
+    units, walking them round-robin so that each is planned about once
+    every interval ticks. A slice never exceeds max_per_tick units; past
+    interval * max_per_tick units the planning period grows instead of the
+    per-tick cost. Between plans units steer by dead reckoning from their
+    last plan.
+    """
+
+    def __init__(self, interval: int = 6, max_per_tick: int = 64):
+        self.interval = max(1, interval)
+        self.max_per_tick = max(1, max_per_tick)
+        self._cursor = 0
+        self._carry = 0.0  # Fractional units owed a plan, for fleets smaller than interval
+
+    def due(self, units):
+        """Return the units to plan this tick."""
+        n = len(units)
+        if n == 0:
+            return []
+        self._carry += n / self.interval
+        count = min(n, self.max_per_tick, int(self._carry))
+        # Work over the cap is dropped rather than carried into later ticks
+        self._carry = self._carry - count if count < self.max_per_tick else 0.0
+        if count == 0:
+            return []
+        start = self._cursor % n
+        self._cursor = start + count
+        if start + count <= n:
+            return units[start:start + count]
+        return units[start:] + units[:start + count - n]
@@ -6,6 +6,18 @@
 import pygame
 from enum import Enum
 import math
+import io
+import os
+import sys
+import json
+import mmap
+import struct
+import queue
+import threading
+import time
+import numpy as np
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 
 ###########################################################
 # Key Enum
@@ -130,6 +142,123 @@ class Key(Enum):
     KP_EQUALS = pygame.K_KP_EQUALS
 
 
+###########################################################
+# Asset Pack
+###########################################################
+# Pack layout: magic, u32 index length, JSON index, then 16-byte aligned blobs.
+# Images are stored as raw RGBA/RGB pixels so loading skips decoding entirely.
+PACK_MAGIC = b"P2DPACK1"
+PACK_IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tga")
+PACK_FONT_EXTENSIONS = (".ttf", ".otf")
+
+
+def _pack_key(path: str) -> str:
+    return os.path.normpath(path).replace("\\", "/")
+
+
+def build_asset_pack(output: str, paths):
+    """Decode the given image and font files and write them into one pack file."""
+    pygame.init()
+    entries = []
+    for path in paths:
+        lower = path.lower()
+        if lower.endswith(PACK_IMAGE_EXTENSIONS):
+            surface = pygame.image.load(path)
+            fmt = "RGBA" if surface.get_alpha() or surface.get_flags() & pygame.SRCALPHA else "RGB"
+            data = pygame.image.tobytes(surface, fmt)
+            entries.append((_pack_key(path), {"type": "image", "format": fmt,
+                                              "width": surface.get_width(), "height": surface.get_height()}, data))
+        elif lower.endswith(PACK_FONT_EXTENSIONS):
+            with open(path, "rb") as f:
+                entries.append((_pack_key(path), {"type": "font"}, f.read()))
+
+    # Offsets are relative to the data section, so the index can be sized first
+    index, offset = {}, 0
+    for key, meta, data in entries:
+        offset = (offset + 15) & ~15
+        index[key] = dict(meta, offset=offset, size=len(data))
+        offset += len(data)
+    index_bytes = json.dumps(index).encode("utf-8")
+    header_size = len(PACK_MAGIC) + 4 + len(index_bytes)
+    data_start = (header_size + 15) & ~15
+
+    with open(output, "wb") as f:
+        f.write(PACK_MAGIC)
+        f.write(struct.pack("<I", len(index_bytes)))
+        f.write(index_bytes)
+        for key, meta, data in entries:
+            f.seek(data_start + index[key]["offset"])
+            f.write(data)
+    return index
+
+
+class AssetPack:
+    """Read-only, memory-mapped view of a pack written by build_asset_pack."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._map[:len(PACK_MAGIC)] != PACK_MAGIC:
+                raise ValueError(f"{path} is not a Panda2D asset pack")
+            header = len(PACK_MAGIC)
+            (index_size,) = struct.unpack_from("<I", self._map, header)
+            header += 4
+            self.index = json.loads(bytes(self._map[header:header + index_size]).decode("utf-8"))
+            self._data_start = (header + index_size + 15) & ~15
+        except Exception:
+            self._file.close()
+            raise
+
+    def has(self, path: str) -> bool:
+        return _pack_key(path) in self.index
+
+    def _view(self, entry):
+        start = self._data_start + entry["offset"]
+        return memoryview(self._map)[start:start + entry["size"]]
+
+    def load_surface(self, path: str):
+        """Create a display-format surface from the raw pixels of an image entry."""
+        entry = self.index[_pack_key(path)]
+        raw = pygame.image.frombuffer(self._view(entry), (entry["width"], entry["height"]), entry["format"])
+        return raw.convert_alpha() if entry["format"] == "RGBA" else raw.convert()
+
+    def font_file(self, path: str):
+        """Return a file object over a font entry for pygame.font.Font."""
+        return io.BytesIO(self._view(self.index[_pack_key(path)]))
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+_asset_pack = None
+
+
+def use_asset_pack(path: str):
+    """Load assets from a pack file when it exists; return the pack or None to use loose files."""
+    global _asset_pack
+    if _asset_pack is not None:
+        _asset_pack.close()
+        _asset_pack = None
+    if path and os.path.exists(path):
+        try:
+            _asset_pack = AssetPack(path)
+        except Exception:
+            _asset_pack = None
+    # Surfaces loaded so far came from the previous source
+    Image._file_surfaces.clear()
+    Image._file_mips.clear()
+    return _asset_pack
+
+
+def _open_font(file: str, size: int):
+    if _asset_pack is not None and _asset_pack.has(file):
+        return pygame.font.Font(_asset_pack.font_file(file), size)
+    return pygame.font.Font(file, size)
+
+
 ###########################################################
 # Font Class
 ###########################################################
@@ -143,7 +272,7 @@ class Font:
         self.file = file
         try:
             if file:
-                self.font = pygame.font.Font(file, int(size))
+                self.font = _open_font(file, int(size))
             else:
                 self.font = pygame.font.SysFont(None, int(size))
         except Exception:
@@ -152,7 +281,7 @@ class Font:
     def set_size(self, size: int):
         self.size = size
         if self.file:
-            self.font = pygame.font.Font(self.file, int(size))
+            self.font = _open_font(self.file, int(size))
         else:
             self.font = pygame.font.SysFont(None, int(size))
 
@@ -206,17 +335,117 @@ class Color:
 # Image Class
 ###########################################################
 class Image:
-    """Image wrapper for Panda2D using pygame surfaces."""
-    def __init__(self, path: str):
+    """Image wrapper for Panda2D using pygame surfaces.
+
+    The surface is loaded on first use, from the active asset pack when it
+    contains the path and from the loose file otherwise. With mipmaps
+    enabled, a chain of half-size levels is built on first scaled draw (or
+    by build_mipmaps) so heavy downscaling starts from a nearby level.
+    The surface, mip chain and rotated collision masks (built per rotation
+    bucket on demand) are shared by all Images of the same file, so every
+    unit of a class hits the same sprite cache entries.
+    """
+    _file_surfaces = {}  # path -> surface
+    _file_mips = {}  # path -> mip chain
+    _file_masks = {}  # path -> {(bucket, steps): mask}
+
+    def __init__(self, path: str, mipmaps: bool = False):
+        self.path = path
+        self.mipmaps = mipmaps
+        self._surface = None
+        self._mip_chain = None
+        self._masks = {}
+
+    @property
+    def surface(self):
+        if self._surface is None:
+            surface = Image._file_surfaces.get(self.path)
+            if surface is None:
+                surface = Image._file_surfaces[self.path] = self._load(self.path)
+            self._surface = surface
+        return self._surface
+
+    @property
+    def key(self):
+        """Identity shared by every Image of the same file, for caches of derived surfaces."""
+        return self.path if self.path is not None else self.surface
+
+    @surface.setter
+    def surface(self, value):
+        self._surface = value
+        self._mip_chain = None
+        self._masks = {}
+
+    def build_mipmaps(self):
+        """Generate the mip chain now instead of on first use."""
+        levels = []
+        level = self.surface
+        while level.get_width() > 1 or level.get_height() > 1:
+            size = (max(1, level.get_width() // 2), max(1, level.get_height() // 2))
+            try:
+                level = pygame.transform.smoothscale(level, size)
+            except ValueError:
+                level = pygame.transform.scale(level, size)  # smoothscale needs 24/32-bit surfaces
+            levels.append(level)
+        self._mip_chain = levels
+        if self.path is not None:
+            Image._file_mips[self.path] = levels
+
+    def mip_level(self, w: int, h: int):
+        """Return the smallest level at least (w, h) in size, or the full surface without mipmaps."""
+        surface = self.surface
+        if not self.mipmaps:
+            return surface
+        if self._mip_chain is None:
+            self._mip_chain = Image._file_mips.get(self.path) if self.path is not None else None
+        if self._mip_chain is None:
+            self.build_mipmaps()
+        for level in self._mip_chain:
+            if level.get_width() < w or level.get_height() < h:
+                break
+            surface = level
+        return surface
+
+    def rotated_mask(self, rotation: float, steps: int = 72):
+        """Return the collision mask of the image rotated clockwise to the nearest of steps buckets."""
+        bucket = int(round(rotation * steps / 360.0)) % steps
+        masks = Image._file_masks.setdefault(self.path, {}) if self.path is not None else self._masks
+        mask = masks.get((bucket, steps))
+        if mask is None:
+            rotated = pygame.transform.rotate(self.surface, -bucket * 360.0 / steps)
+            mask = masks[(bucket, steps)] = pygame.mask.from_surface(rotated)
+        return mask
+
+    def hit_test(self, x: float, y: float, rotation: float = 0.0, steps: int = 72) -> bool:
+        """Return True if (x, y) lands on an opaque pixel of the rotated image.
+
+        x and y are offsets from the image center in image pixels, with y up.
+        """
+        mask = self.rotated_mask(rotation, steps)
+        w, h = mask.get_size()
+        px, py = int(w / 2 + x), int(h / 2 - y)
+        return 0 <= px < w and 0 <= py < h and bool(mask.get_at((px, py)))
+
+    @classmethod
+    def from_surface(cls, surface):
+        """Wrap an existing pygame surface."""
+        image = cls(None)
+        image.surface = surface
+        return image
+
+    @staticmethod
+    def _load(path: str):
         try:
+            if _asset_pack is not None and _asset_pack.has(path):
+                return _asset_pack.load_surface(path)
             loaded = pygame.image.load(path)
             if loaded.get_alpha() or loaded.get_flags() & pygame.SRCALPHA:
-                self.surface = loaded.convert_alpha()
-            else:
-                self.surface = loaded.convert()
+                return loaded.convert_alpha()
+            return loaded.convert()
         except Exception:
-            self.surface = pygame.Surface((1, 1), pygame.SRCALPHA)
-            self.surface.fill((0, 0, 0, 0))
+            surface = pygame.Surface((1, 1), pygame.SRCALPHA)
+            surface.fill((0, 0, 0, 0))
+            return surface
 
     def get_width(self):
         """Return the width of the image surface."""
@@ -231,8 +460,15 @@ class Image:
 # Sound Class
 ###########################################################
 class Sound:
-    """Sound wrapper for Panda2D using pygame mixer."""
-    def __init__(self, path: str):
+    """Sound wrapper for Panda2D using pygame mixer.
+
+    Higher priority sounds may steal channels from lower priority ones, and
+    at most max_per_frame copies of the same sound start in one frame.
+    """
+    def __init__(self, path: str, priority: int = 0, volume: float = 1.0, max_per_frame: int = 2):
+        self.priority = priority
+        self.volume = volume
+        self.max_per_frame = max_per_frame
         try:
             if not pygame.mixer.get_init():
                 pygame.mixer.init()
@@ -241,6 +477,98 @@ class Sound:
             self.sound = None
 
 
+###########################################################
+# Sound Engine
+###########################################################
+class SoundEngine:
+    """Plays sounds on a fixed pool of mixer channels with spatial attenuation.
+
+    Positional sounds are attenuated by distance from the camera's view
+    center, measured in view radii so that everything on screen plays at
+    full volume and sounds fade to silence at hearing_range view radii.
+    Inaudible sounds are culled before they take a channel.
+    """
+
+    def __init__(self, camera: 'Camera' = None, channels: int = 16, hearing_range: float = 2.0,
+                 min_volume: float = 0.05):
+        self.camera = camera
+        self.hearing_range = hearing_range
+        self.min_volume = min_volume
+        self._frame_counts = {}
+        self._voices = []  # (priority, start order) per channel
+        self._order = 0
+        self.stats = {"played": 0, "culled": 0, "rate_limited": 0, "stolen": 0, "dropped": 0}
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            pygame.mixer.set_num_channels(channels)
+            self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        except Exception:
+            self.channels = []
+        self._voices = [(0, 0)] * len(self.channels)
+
+    def begin_frame(self):
+        """Reset the per-frame rate limits."""
+        if self._frame_counts:
+            self._frame_counts.clear()
+
+    def _spatialize(self, x, y):
+        """Return (volume, pan) for a world position, pan in -1 (left) .. 1 (right)."""
+        if self.camera is None or x is None or y is None:
+            return 1.0, 0.0
+        left, bottom, right, top = self.camera.visible_world_rect()
+        half_w, half_h = (right - left) / 2, (top - bottom) / 2
+        dx = x - (left + half_w)
+        dy = y - (bottom + half_h)
+        radius = math.hypot(half_w, half_h) or 1.0
+        distance = math.hypot(dx, dy) / radius
+        volume = 1.0 if distance <= 1 else max(0.0, 1 - (distance - 1) / max(self.hearing_range - 1, 1e-6))
+        pan = max(-1.0, min(1.0, dx / (half_w or 1.0)))
+        return volume, pan
+
+    def _pick_channel(self, priority):
+        """Return a free channel index, or steal the oldest lowest-priority voice at or below priority."""
+        victim = -1
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return index
+            if self._voices[index][0] <= priority and (victim < 0 or self._voices[index] < self._voices[victim]):
+                victim = index
+        if victim >= 0:
+            self.channels[victim].stop()
+            self.stats["stolen"] += 1
+        return victim
+
+    def play(self, sound: Sound, x: float = None, y: float = None):
+        """Play a sound, positioned in world space when x and y are given; return the channel or None."""
+        if not self.channels or sound is None or sound.sound is None:
+            return None
+        count = self._frame_counts.get(sound, 0)
+        if count >= sound.max_per_frame:
+            self.stats["rate_limited"] += 1
+            return None
+        volume, pan = self._spatialize(x, y)
+        volume *= sound.volume
+        if volume < self.min_volume:
+            self.stats["culled"] += 1
+            return None
+        index = self._pick_channel(sound.priority)
+        if index < 0:
+            self.stats["dropped"] += 1
+            return None
+        channel = self.channels[index]
+        try:
+            channel.play(sound.sound)
+            channel.set_volume(volume * min(1.0, 1 - pan), volume * min(1.0, 1 + pan))
+        except Exception:
+            return None
+        self._order += 1
+        self._voices[index] = (sound.priority, self._order)
+        self._frame_counts[sound] = count + 1
+        self.stats["played"] += 1
+        return channel
+
+
 ###########################################################
 # Resizable & Anchor Enums
 ###########################################################
@@ -264,6 +592,587 @@ class Anchor(Enum):
     BOTTOMRIGHT = "bottomright"
 
 
+###########################################################
+# Camera Class
+###########################################################
+class Camera:
+    """World-to-screen camera with a cached affine transform.
+
+    World point (wx, wy) maps to Panda2D screen coordinates as
+    ``(wx + x) * scale * zoom``. The transform to pygame pixels (including the
+    Y flip and window-center origin) is cached and only rebuilt after a pan,
+    zoom, scale or resize.
+    """
+
+    def __init__(self, width: int, height: int, x: float = 0.0, y: float = 0.0,
+                 zoom: float = 1.0, scale: float = 1.0):
+        self._width, self._height = width, height
+        self._x, self._y = x, y
+        self._zoom, self._scale = zoom, scale
+        self._transform = None
+        self.version = 0
+
+    # ---------------- State ----------------
+    def _invalidate(self):
+        self._transform = None
+        self.version += 1
+
+    @property
+    def x(self):
+        return self._x
+
+    @x.setter
+    def x(self, value):
+        if value != self._x:
+            self._x = value
+            self._invalidate()
+
+    @property
+    def y(self):
+        return self._y
+
+    @y.setter
+    def y(self, value):
+        if value != self._y:
+            self._y = value
+            self._invalidate()
+
+    @property
+    def zoom(self):
+        return self._zoom
+
+    @zoom.setter
+    def zoom(self, value):
+        if value != self._zoom:
+            self._zoom = value
+            self._invalidate()
+
+    @property
+    def scale(self):
+        return self._scale
+
+    @scale.setter
+    def scale(self, value):
+        if value != self._scale:
+            self._scale = value
+            self._invalidate()
+
+    def pan(self, dx: float, dy: float):
+        """Move the camera offset by (dx, dy) world units."""
+        self.x = self._x + dx
+        self.y = self._y + dy
+
+    def resize(self, width: int, height: int):
+        """Update the viewport size in pixels."""
+        if (width, height) != (self._width, self._height):
+            self._width, self._height = width, height
+            self._invalidate()
+
+    @property
+    def factor(self):
+        """Combined world-to-screen scale factor (scale * zoom)."""
+        return self._get_transform()[0]
+
+    def _get_transform(self):
+        """Return the cached (factor, screen offsets, pixel offsets) tuple, rebuilding it if invalidated."""
+        if self._transform is None:
+            k = self._scale * self._zoom
+            sx, sy = self._x * k, self._y * k
+            ox, oy = self._width // 2, self._height // 2
+            self._transform = (k, sx, sy, ox + sx, oy - sy)
+        return self._transform
+
+    # ---------------- Scalar Conversions ----------------
+    def world_to_screen(self, x: float, y: float) -> tuple[float, float]:
+        """Convert world coordinates to Panda2D screen coordinates."""
+        k, sx, sy, _, _ = self._get_transform()
+        return x * k + sx, y * k + sy
+
+    def screen_to_world(self, x: float, y: float) -> tuple[float, float]:
+        """Convert Panda2D screen coordinates to world coordinates."""
+        k, sx, sy, _, _ = self._get_transform()
+        return (x - sx) / k, (y - sy) / k
+
+    def world_to_pygame(self, x: float, y: float) -> tuple[int, int]:
+        """Convert world coordinates directly to pygame pixel coordinates."""
+        k, _, _, px, py = self._get_transform()
+        return int(x * k + px), int(py - y * k)
+
+    def pygame_to_world(self, px: float, py: float) -> tuple[float, float]:
+        """Convert pygame pixel coordinates to world coordinates."""
+        k, _, _, tx, ty = self._get_transform()
+        return (px - tx) / k, (ty - py) / k
+
+    # ---------------- Batch Conversions ----------------
+    def world_to_screen_array(self, xs, ys):
+        """Vectorized world_to_screen for NumPy arrays (or sequences)."""
+        k, sx, sy, _, _ = self._get_transform()
+        return np.asarray(xs, dtype=float) * k + sx, np.asarray(ys, dtype=float) * k + sy
+
+    def screen_to_world_array(self, xs, ys):
+        """Vectorized screen_to_world for NumPy arrays (or sequences)."""
+        k, sx, sy, _, _ = self._get_transform()
+        return (np.asarray(xs, dtype=float) - sx) / k, (np.asarray(ys, dtype=float) - sy) / k
+
+    def world_to_pygame_array(self, xs, ys):
+        """Vectorized world_to_pygame; returns int arrays of pixel coordinates."""
+        k, _, _, px, py = self._get_transform()
+        xs = np.asarray(xs, dtype=float) * k + px
+        ys = py - np.asarray(ys, dtype=float) * k
+        return xs.astype(int), ys.astype(int)
+
+    # ---------------- Visibility ----------------
+    def visible_world_rect(self, margin: float = 0.0) -> tuple[float, float, float, float]:
+        """Return (left, bottom, right, top) of the visible world area, grown by margin world units."""
+        left, bottom = self.screen_to_world(-self._width / 2, -self._height / 2)
+        right, top = self.screen_to_world(self._width / 2, self._height / 2)
+        return left - margin, bottom - margin, right + margin, top + margin
+
+    def is_visible(self, x: float, y: float, radius: float = 0.0) -> bool:
+        """Return True if a world-space circle overlaps the visible area."""
+        left, bottom, right, top = self.visible_world_rect(radius)
+        return left <= x <= right and bottom <= y <= top
+
+    def visible_mask(self, xs, ys, radius=0.0):
+        """Vectorized is_visible; radius may be a scalar or an array."""
+        left, bottom, right, top = self.visible_world_rect()
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        return (xs >= left - radius) & (xs <= right + radius) & (ys >= bottom - radius) & (ys <= top + radius)
+
+
+###########################################################
+# Quality Governor
+###########################################################
+class QualityGovernor:
+    """Steps quality tiers up and down to keep frame time within a budget.
+
+    Tier 0 is the highest quality. Knobs are registered as one value per tier;
+    a shorter list repeats its last value for the lower tiers.
+    """
+
+    def __init__(self, target_fps: int = 60, tiers: int = 4, window: int = 30,
+                 downgrade_ratio: float = 0.9, upgrade_ratio: float = 0.5):
+        self.target_fps = target_fps
+        self.tiers = tiers
+        self.tier = 0
+        self.enabled = True
+        self.downgrade_ratio = downgrade_ratio
+        self.upgrade_ratio = upgrade_ratio
+        self._samples = deque(maxlen=window)
+        self._knobs = {}
+
+    @property
+    def budget_ms(self):
+        return 1000.0 / self.target_fps
+
+    def register_knob(self, name: str, values):
+        """Register a knob with one value per tier (highest quality first)."""
+        values = list(values)
+        if not values:
+            raise ValueError(f"Knob '{name}' needs at least one value")
+        self._knobs[name] = values
+
+    def get(self, name: str, default=None):
+        """Return the value of a knob for the current tier."""
+        values = self._knobs.get(name)
+        if values is None:
+            return default
+        return values[min(self.tier, len(values) - 1)]
+
+    def set_tier(self, tier: int):
+        """Force a tier and restart the measurement window."""
+        self.tier = max(0, min(self.tiers - 1, int(tier)))
+        self._samples.clear()
+
+    def record(self, frame_ms: float) -> bool:
+        """Record the work time of one frame; return True if the tier changed.
+
+        The tier only moves once a full window has been collected, and the
+        window restarts after every change, which gives the hysteresis.
+        """
+        if not self.enabled:
+            return False
+        self._samples.append(frame_ms)
+        if len(self._samples) < self._samples.maxlen:
+            return False
+        average = sum(self._samples) / len(self._samples)
+        if average > self.budget_ms * self.downgrade_ratio and self.tier < self.tiers - 1:
+            self.set_tier(self.tier + 1)
+            return True
+        if average < self.budget_ms * self.upgrade_ratio and self.tier > 0:
+            self.set_tier(self.tier - 1)
+            return True
+        return False
+
+
+###########################################################
+# Frame Capture
+###########################################################
+class FrameCapture:
+    """Records every Nth frame to disk without encoding on the main thread.
+
+    Frames are copied into a ring of preallocated surfaces, and worker
+    threads encode them either to a PNG sequence or to raw rgb24 frames.
+    Raw frames can be fed to an external encoder, for example:
+    cat frame_*.rgb | ffmpeg -f rawvideo -pix_fmt rgb24 -s WxH -r FPS -i - out.mp4
+    capture.json records the frame size. A window resize starts a new
+    segment in a numbered subdirectory (segment_001, ...) with its own
+    capture.json and frame numbers, so each directory holds one size.
+    When every buffer is still queued, the frame is dropped instead of waiting.
+    """
+
+    def __init__(self, directory: str, every: int = 1, image_format: str = "png", buffers: int = 8,
+                 workers: int = 2, fps: int = 60):
+        if image_format not in ("png", "raw"):
+            raise ValueError(f"Unsupported capture format '{image_format}'")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.every = max(1, int(every))
+        self.image_format = image_format
+        self.fps = fps
+        self.frame = 0
+        self.captured = 0
+        self.dropped = 0
+        self._slots = [None] * buffers
+        self._free = queue.Queue()
+        for index in range(buffers):
+            self._free.put(index)
+        self._work = queue.Queue()
+        self._size = None
+        self.segment = -1
+        self._segment_directory = None
+        self._segment_frame = 0
+        self._workers = [threading.Thread(target=self._run, name=f"capture-{i}", daemon=True) for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, screen):
+        """Copy the screen into a free buffer if this frame should be captured."""
+        self.frame += 1
+        if (self.frame - 1) % self.every:
+            return
+        try:
+            index = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return
+        size = screen.get_size()
+        if self._size != size:
+            self._size = size
+            self._start_segment(size)
+        slot = self._slots[index]
+        if slot is None or slot.get_size() != size:
+            # Only happens for the first frames and after a resize
+            slot = self._slots[index] = pygame.Surface(size).convert(screen)
+        slot.blit(screen, (0, 0))
+        self._work.put((index, os.path.join(self._segment_directory, f"frame_{self._segment_frame:06d}")))
+        self._segment_frame += 1
+        self.captured += 1
+
+    def _start_segment(self, size):
+        self.segment += 1
+        self._segment_frame = 0
+        if self.segment == 0:
+            self._segment_directory = self.directory
+        else:
+            self._segment_directory = os.path.join(self.directory, f"segment_{self.segment:03d}")
+            os.makedirs(self._segment_directory, exist_ok=True)
+        with open(os.path.join(self._segment_directory, "capture.json"), "w") as f:
+            json.dump({"width": size[0], "height": size[1], "format": self.image_format,
+                       "pixel_format": "rgb24", "fps": self.fps / self.every}, f)
+
+    def _run(self):
+        while True:
+            job = self._work.get()
+            if job is None:
+                return
+            index, path = job
+            slot = self._slots[index]
+            try:
+                if self.image_format == "png":
+                    pygame.image.save(slot, path + ".png")
+                else:
+                    with open(path + ".rgb", "wb") as f:
+                        f.write(pygame.image.tobytes(slot, "RGB"))
+            except Exception:
+                pass
+            finally:
+                self._free.put(index)
+
+    def close(self):
+        """Finish encoding the queued frames and stop the workers."""
+        for _ in self._workers:
+            self._work.put(None)
+        for worker in self._workers:
+            worker.join()
+
+
+###########################################################
+# Profile Capture
+###########################################################
+class ProfileCapture:
+    """Profiles the main loop for a limited number of frames or seconds.
+
+    A sampler thread records the main thread's call stack every
+    sample_interval seconds and writes them as collapsed stacks
+    (profile.folded, one "frame;frame;frame count" line per stack), which
+    flamegraph.pl and speedscope read directly. With use_cprofile, the
+    main thread runs under cProfile instead and its stats are dumped to
+    profile.pstats. The two never run together, because cProfile's per-call
+    overhead would distort the sampled stacks and frame times. profile.json
+    holds the tags passed in, such as the unit count and camera state at
+    the start of the capture.
+    """
+
+    def __init__(self, directory: str, frames: int = 120, seconds: float = None, sample_interval: float = 0.002,
+                 use_cprofile: bool = False, tags: dict = None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.frames = frames
+        self.seconds = seconds
+        self.sample_interval = sample_interval
+        self.tags = dict(tags or {})
+        self.frame = 0
+        self.samples = {}
+        self._thread_id = threading.get_ident()
+        self._started = time.perf_counter()
+        self._stop = threading.Event()
+        self._profiler = None
+        self._sampler = None
+        if use_cprofile:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._sampler = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+            self._sampler.start()
+
+    def _sample(self):
+        current_frames = sys._current_frames
+        while not self._stop.wait(self.sample_interval):
+            frame = current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self.samples[key] = self.samples.get(key, 0) + 1
+
+    def end_frame(self) -> bool:
+        """Count a finished frame; return True once the capture should stop."""
+        self.frame += 1
+        if self.frames is not None and self.frame >= self.frames:
+            return True
+        return self.seconds is not None and time.perf_counter() - self._started >= self.seconds
+
+    def close(self):
+        """Stop profiling and write the results; return the output directory."""
+        if self._profiler is not None:
+            self._profiler.disable()
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        elapsed = time.perf_counter() - self._started
+        if self._profiler is not None:
+            self._profiler.dump_stats(os.path.join(self.directory, "profile.pstats"))
+        else:
+            with open(os.path.join(self.directory, "profile.folded"), "w") as f:
+                for stack, count in sorted(self.samples.items()):
+                    f.write(f"{stack} {count}\n")
+        with open(os.path.join(self.directory, "profile.json"), "w") as f:
+            json.dump(dict(self.tags, frames=self.frame, seconds=round(elapsed, 3), cprofile=self._profiler is not None,
+                           samples=sum(self.samples.values()), sample_interval=self.sample_interval), f, indent=2)
+        return self.directory
+
+
+###########################################################
+# Scene Graph
+###########################################################
+class SceneNode:
+    """Node in a 2-D scene graph with a cached world transform.
+
+    Local position, rotation (degrees clockwise) and scale are relative to
+    the parent. The world transform is recomputed only after the node or
+    one of its ancestors changed. Nodes with inherit_rotation=False keep
+    their offset and rotation in world axes (e.g. a marker floating above
+    a turning ship). Nodes draw in ascending layer order. collect() caches
+    its sorted draw list, which is rebuilt only after a child is added or
+    removed, or a node's image, layer or visibility changes below it.
+    """
+
+    def __init__(self, image: Image = None, x: float = 0.0, y: float = 0.0, rotation: float = 0.0,
+                 scale: float = 1.0, layer: int = 0, filter: Color = None, inherit_rotation: bool = True,
+                 visible: bool = True):
+        self._image = image
+        self._layer = layer
+        self.filter = filter
+        self._visible = visible
+        self.inherit_rotation = inherit_rotation
+        self.parent = None
+        self.children = {}  # Insertion-ordered set (values unused), so removing a child is O(1)
+        self._x, self._y, self._rotation, self._scale = x, y, rotation, scale
+        self._world = None  # (x, y, rotation, scale); None while dirty
+        self._radius = None  # World-space bounding radius; None while dirty
+        self._draw_list = None  # Cached collect() result; None while the subtree's structure changed
+
+    # ---------------- Hierarchy ----------------
+    def add_child(self, node: 'SceneNode') -> 'SceneNode':
+        if node.parent is not None:
+            node.parent.remove_child(node)
+        node.parent = self
+        self.children[node] = None
+        node._invalidate()
+        self._restructure()
+        return node
+
+    def remove_child(self, node: 'SceneNode'):
+        if node.parent is self:
+            del self.children[node]
+            node.parent = None
+            node._invalidate()
+            self._restructure()
+
+    def _restructure(self):
+        # Drop the cached draw lists of this node and every ancestor
+        node = self
+        while node is not None:
+            node._draw_list = None
+            node = node.parent
+
+    @property
+    def image(self):
+        return self._image
+
+    @image.setter
+    def image(self, value):
+        if value is not self._image:
+            self._image = value
+            self._radius = None
+            self._restructure()
+
+    @property
+    def layer(self):
+        return self._layer
+
+    @layer.setter
+    def layer(self, value):
+        if value != self._layer:
+            self._layer = value
+            self._restructure()
+
+    @property
+    def visible(self):
+        return self._visible
+
+    @visible.setter
+    def visible(self, value):
+        if value != self._visible:
+            self._visible = value
+            self._restructure()
+
+    # ---------------- Local Transform ----------------
+    def _invalidate(self):
+        # A clean node implies a clean parent, so a dirty node's subtree is already dirty
+        if self._world is None:
+            return
+        self._world = None
+        self._radius = None
+        for child in self.children:
+            child._invalidate()
+
+    def set_transform(self, x: float = None, y: float = None, rotation: float = None, scale: float = None):
+        """Update any part of the local transform, invalidating the subtree only on change."""
+        x = self._x if x is None else x
+        y = self._y if y is None else y
+        rotation = self._rotation if rotation is None else rotation
+        scale = self._scale if scale is None else scale
+        if (x, y, rotation, scale) != (self._x, self._y, self._rotation, self._scale):
+            self._x, self._y, self._rotation, self._scale = x, y, rotation, scale
+            self._invalidate()
+
+    @property
+    def x(self):
+        return self._x
+
+    @x.setter
+    def x(self, value):
+        self.set_transform(x=value)
+
+    @property
+    def y(self):
+        return self._y
+
+    @y.setter
+    def y(self, value):
+        self.set_transform(y=value)
+
+    @property
+    def rotation(self):
+        return self._rotation
+
+    @rotation.setter
+    def rotation(self, value):
+        self.set_transform(rotation=value)
+
+    @property
+    def scale(self):
+        return self._scale
+
+    @scale.setter
+    def scale(self, value):
+        self.set_transform(scale=value)
+
+    # ---------------- World Transform ----------------
+    def world_transform(self):
+        """Return the cached world (x, y, rotation, scale), recomputing it if dirty."""
+        if self._world is None:
+            if self.parent is None:
+                self._world = (self._x, self._y, self._rotation, self._scale)
+            else:
+                px, py, prot, pscale = self.parent.world_transform()
+                lx, ly = self._x * pscale, self._y * pscale
+                if self.inherit_rotation:
+                    # Rotate the offset clockwise by the parent's rotation
+                    rad = math.radians(prot)
+                    cos, sin = math.cos(rad), math.sin(rad)
+                    lx, ly = lx * cos + ly * sin, ly * cos - lx * sin
+                    rotation = prot + self._rotation
+                else:
+                    rotation = self._rotation
+                self._world = (px + lx, py + ly, rotation, pscale * self._scale)
+        return self._world
+
+    def world_radius(self):
+        """Return the cached world-space bounding radius of the node's image (0 without one)."""
+        if self._radius is None:
+            scale = self.world_transform()[3]
+            image = self._image
+            self._radius = max(image.get_width(), image.get_height()) * scale / 2 if image is not None else 0.0
+        return self._radius
+
+    def collect(self):
+        """Return the visible nodes with images in this subtree, sorted by layer.
+
+        The list is cached until the subtree's structure changes; don't modify it.
+        """
+        if self._draw_list is None:
+            out = []
+            self._collect_into(out)
+            out.sort(key=lambda node: node._layer)
+            self._draw_list = out
+        return self._draw_list
+
+    def _collect_into(self, out):
+        if self._visible:
+            if self._image is not None:
+                out.append(self)
+            for child in self.children:
+                child._collect_into(out)
+
+
 ###########################################################
 # PandaWindow Base Class
 ###########################################################
@@ -276,6 +1185,8 @@ class PandaWindow:
         title="Panda2D Window",
         resizable=Resizable.NONE,
         anchor=Anchor.CENTER,
+        target_fps=60,
+        asset_pack=None,
     ):
         pygame.init()
         try:
@@ -290,7 +1201,28 @@ class PandaWindow:
 
         self.screen = pygame.display.set_mode((width, height), self._flags)
         pygame.display.set_caption(title)
+        self.asset_pack = use_asset_pack(asset_pack)
+        self._anchor_offset = (width // 2, height // 2)
+        self._render_scale = 1.0
+        self.world_render_scale = 1.0
+        self._world_surface = None
+        self.camera = Camera(width, height)
         self.clock = pygame.time.Clock()
+        self.target_fps = target_fps
+        self.stats = {}
+        self.sound_engine = SoundEngine(self.camera)
+        self.capture = None
+        self.profile = None
+        self.quality = QualityGovernor(target_fps)
+        self.quality.register_knob("smooth_scale", [True, False])
+        self.quality.register_knob("rotation_steps", [360, 120, 72, 36])
+        self._sprite_cache = OrderedDict()  # Least recently used first
+        self._sprite_cache_limit = 512
+        self._sprite_cache_pixels = 0
+        self._sprite_cache_pixel_limit = 16_000_000
+        self._scratch_pool = {}
+        self.stats["scratch_allocations"] = 0
+        self.stats["scratch_reuses"] = 0
         self.running = False
         self.mousex = 0
         self.mousey = 0
@@ -299,32 +1231,42 @@ class PandaWindow:
         self.mousedownprimary = False
         self.mousedownmiddle = False
         self.mousedownsecondary = False
+        self.mouse_time = 0.0  # perf_counter() time the mouse position was sampled
+        self.late_latch = False  # Re-sample the mouse after update(), just before draw()
+        self.idle_timeout_ms = 250  # Longest sleep between idle frames; 0 disables idle frame skipping
+        # (event name, poll-to-flip ms, previous-poll-to-flip ms) of recent input events; the event
+        # arrived somewhere in between, since pygame events carry no timestamp
+        self.input_latency = deque(maxlen=240)
+        self._pending_inputs = []
+        self._last_poll_time = time.perf_counter()
 
     # ---------------- Coordinate System ----------------
     def _get_anchor_offset(self):
-        """Return window center as origin for Panda2D coordinates."""
-        return (self.width // 2, self.height // 2)
-
-
+        """Return window center as origin for Panda2D coordinates (cached, updated on resize)."""
+        return self._anchor_offset
 
     def _panda_to_pygame_x(self, x: float) -> int:
-        ox, _ = self._get_anchor_offset()
-        return int(ox + x)
+        ox, _ = self._anchor_offset
+        return int(ox + x * self._render_scale)
 
     # Panda2D (x, y): x+ right, y+ up, origin at anchor
     # Pygame (px, py): x+ right, y+ down, origin at top-left
+    # Inside world_layer the current surface is smaller than the window, so
+    # coordinates are additionally multiplied by the render scale.
     def panda2d_to_pygame(self, x: float, y: float) -> tuple[int, int]:
         """Convert Panda2D coordinates to Pygame coordinates."""
-        ox, oy = self._get_anchor_offset()
-        px = int(ox + x)
-        py = int(oy - y)
+        ox, oy = self._anchor_offset
+        s = self._render_scale
+        px = int(ox + x * s)
+        py = int(oy - y * s)
         return px, py
 
     def pygame_to_panda2d(self, px: int, py: int) -> tuple[float, float]:
         """Convert Pygame coordinates to Panda2D coordinates."""
-        ox, oy = self._get_anchor_offset()
-        x = px - ox
-        y = oy - py
+        ox, oy = self._anchor_offset
+        s = self._render_scale
+        x = (px - ox) / s
+        y = (oy - py) / s
         return x, y
 
     def _get_anchor_pos(self, x, y, w, h, anchor):
@@ -383,6 +1325,11 @@ class PandaWindow:
         x, y = self.pygame_to_panda2d(mx, my)
         return x, y
 
+    def latch_mouse(self):
+        """Re-sample the mouse position so drawing uses the freshest input."""
+        self.mousex, self.mousey = self.mouse_world
+        self.mouse_time = time.perf_counter()
+
     # ---------------- Keyboard Input ----------------
     def keydown(self, key: Key) -> bool:
         pressed = pygame.key.get_pressed()
@@ -404,15 +1351,44 @@ class PandaWindow:
                 h = int(w / ratio)
         self.width, self.height = w, h
         self.screen = pygame.display.set_mode((w, h), self._flags)
+        self._anchor_offset = (w // 2, h // 2)
+        self.camera.resize(w, h)
+        self._trim_scratch_pool()
 
     # ---------------- Main Loop ----------------
     def start(self):
         self.running = True
         self.initialize()
 
+        idle = False
         while self.running:
-            self.deltatime = self.clock.tick(60) / 1000.0
-            for event in pygame.event.get():
+            events = []
+            if idle:
+                # Nothing changed last frame: sleep until input arrives or the timeout passes
+                event = pygame.event.wait(self.idle_timeout_ms)
+                # wait() returns as soon as an event arrives, so nothing sat queued before this
+                self._last_poll_time = time.perf_counter()
+                if event.type != pygame.NOEVENT:
+                    events.append(event)
+                self.clock.tick()
+                self.deltatime = 1.0 / self.target_fps
+            else:
+                self.deltatime = self.clock.tick(self.target_fps) / 1000.0
+                # Raw time excludes the tick delay, so it measures the previous frame's work
+                frame_ms = self.clock.get_rawtime()
+                if self.quality.record(frame_ms):
+                    self._clear_sprite_cache()
+                self.stats["frame_ms"] = frame_ms
+            self.sound_engine.begin_frame()
+            self.stats["quality_tier"] = self.quality.tier
+            events += pygame.event.get()
+            # Events carry no usable timestamp: each one arrived between the previous poll and this one,
+            # possibly while clock.tick() slept
+            poll_time, previous_poll_time = time.perf_counter(), self._last_poll_time
+            self._last_poll_time = poll_time
+            for event in events:
+                if event.type in (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN):
+                    self._pending_inputs.append((pygame.event.event_name(event.type), poll_time, previous_poll_time))
                 if event.type == pygame.QUIT:
                     self.running = False
                 elif event.type == pygame.VIDEORESIZE:
@@ -432,18 +1408,97 @@ class PandaWindow:
                     elif event.button == 3:
                         self.mousedownsecondary = False
 
-            self.mousex, self.mousey = self.mouse_world
+            previous_mouse = (self.mousex, self.mousey)
+            self.latch_mouse()
+            had_input = (bool(events) or (self.mousex, self.mousey) != previous_mouse or any(pygame.key.get_pressed())
+                         or self.mousedownprimary or self.mousedownmiddle or self.mousedownsecondary)
 
             self.update()
+            was_idle = idle
+            idle = (self.idle_timeout_ms > 0 and self.capture is None and self.profile is None and not had_input
+                    and self.is_idle())
+            self.stats["idle"] = idle
+            if was_idle and idle:
+                # The last drawn frame is still current
+                self.stats["idle_frames"] = self.stats.get("idle_frames", 0) + 1
+                continue
+            if self.late_latch:
+                self.latch_mouse()
             self.draw()
+            if self.capture is not None:
+                self.capture.submit(self.screen)
+                self.stats["capture_dropped"] = self.capture.dropped
             pygame.display.flip()
+            self._report_input_latency(time.perf_counter())
+            if self.profile is not None and self.profile.end_frame():
+                self.stop_profile()
 
+        self.shutdown()
+        self.stop_capture()
+        self.stop_profile()
         try:
             pygame.mixer.quit()
         except Exception:
             pass
         pygame.quit()
 
+    def _report_input_latency(self, flip_time):
+        """Record the input-to-flip latency range of this frame's input events into stats.
+
+        input_latency_low_ms (poll to flip) and input_latency_high_ms
+        (previous poll to flip) bound the latest event's latency; the
+        average and maximum use the high bound.
+        """
+        self.stats["mouse_age_ms"] = (flip_time - self.mouse_time) * 1000
+        if not self._pending_inputs:
+            return
+        for name, poll_time, previous_poll_time in self._pending_inputs:
+            self.input_latency.append((name, (flip_time - poll_time) * 1000, (flip_time - previous_poll_time) * 1000))
+        self._pending_inputs.clear()
+        latencies = [high for _, _, high in self.input_latency]
+        self.stats["input_latency_low_ms"] = self.input_latency[-1][1]
+        self.stats["input_latency_high_ms"] = latencies[-1]
+        self.stats["input_latency_avg_ms"] = sum(latencies) / len(latencies)
+        self.stats["input_latency_max_ms"] = max(latencies)
+
+    # ---------------- Frame Capture ----------------
+    def start_capture(self, directory: str, every: int = 1, image_format: str = "png", buffers: int = 8,
+                      workers: int = 2):
+        """Start recording every Nth frame into directory (see FrameCapture)."""
+        self.stop_capture()
+        self.capture = FrameCapture(directory, every, image_format, buffers, workers, self.target_fps)
+        return self.capture
+
+    def stop_capture(self):
+        """Stop recording and wait for queued frames to be written."""
+        if self.capture is not None:
+            self.capture.close()
+            self.capture = None
+
+    # ---------------- Profile Capture ----------------
+    def start_profile(self, directory: str, frames: int = 120, seconds: float = None, sample_interval: float = 0.002,
+                      use_cprofile: bool = False):
+        """Profile the next frames (or seconds) into directory, tagged with profile_tags() (see ProfileCapture)."""
+        self.stop_profile()
+        self.profile = ProfileCapture(directory, frames, seconds, sample_interval, use_cprofile, self.profile_tags())
+        return self.profile
+
+    def stop_profile(self):
+        """Stop a running profile capture early and write what it recorded."""
+        if self.profile is not None:
+            profile, self.profile = self.profile, None
+            self.stats["last_profile"] = profile.close()
+
+    def profile_tags(self) -> dict:
+        """Return the state recorded alongside a profile capture."""
+        camera = self.camera
+        return {
+            "camera": {"x": camera.x, "y": camera.y, "zoom": camera.zoom, "scale": camera.scale},
+            "window": [self.width, self.height],
+            "quality_tier": self.quality.tier,
+            "stats": {key: value for key, value in self.stats.items() if isinstance(value, (int, float, bool))},
+        }
+
     # ---------------- User Override Methods ----------------
     def initialize(self):
         pass
@@ -454,19 +1509,119 @@ class PandaWindow:
     def draw(self):
         pass
 
+    def is_idle(self) -> bool:
+        """Return True when nothing will change on screen without input; redraws are then skipped."""
+        return False
+
+    def shutdown(self):
+        pass
+
+    # ---------------- Render Targets ----------------
+    def new_layer(self, size=None, opaque: bool = False):
+        """Return a transparent surface the size of the window, or of size.
+
+        Opaque layers have no alpha channel and match the screen's pixel
+        format, which makes blitting them a plain copy.
+        """
+        size = size or (self.width, self.height)
+        if opaque:
+            return pygame.Surface(size).convert(self.screen)
+        return pygame.Surface(size, pygame.SRCALPHA)
+
+    @contextmanager
+    def render_target(self, surface, origin=(0, 0)):
+        """Temporarily redirect all drawing methods to a surface.
+
+        origin is the pygame position in the current target that maps to the
+        surface's top-left corner, for surfaces covering another region than
+        the window.
+        """
+        screen, anchor_offset = self.screen, self._anchor_offset
+        self.screen = surface
+        self._anchor_offset = (anchor_offset[0] - origin[0], anchor_offset[1] - origin[1])
+        try:
+            yield surface
+        finally:
+            self.screen, self._anchor_offset = screen, anchor_offset
+
+    def blit_layer(self, surface, position=(0, 0)):
+        """Composite a layer onto the screen with its top-left corner at a pygame position."""
+        self.screen.blit(surface, position)
+
+    @contextmanager
+    def world_layer(self):
+        """Draw the enclosed world layers at world_render_scale of the window resolution.
+
+        Drawing calls keep using window coordinates; they are scaled onto an
+        offscreen surface which is then upscaled to the screen in one blit.
+        Text drawn inside is not scaled, so keep the HUD outside.
+        """
+        scale = self.world_render_scale
+        if scale >= 1.0:
+            yield
+            return
+        size = (max(1, int(self.width * scale)), max(1, int(self.height * scale)))
+        if self._world_surface is None or self._world_surface.get_size() != size:
+            self._world_surface = pygame.Surface(size).convert(self.screen)
+        screen, anchor_offset = self.screen, self._anchor_offset
+        self.screen = self._world_surface
+        self._anchor_offset = (anchor_offset[0] * scale, anchor_offset[1] * scale)
+        self._render_scale = scale
+        try:
+            yield
+        finally:
+            self.screen, self._anchor_offset = screen, anchor_offset
+            self._render_scale = 1.0
+        pygame.transform.scale(self._world_surface, (self.width, self.height), self.screen)
+
+    # ---------------- Scratch Surfaces ----------------
+    @staticmethod
+    def _scratch_bucket(size):
+        return max(32, 1 << (int(size) - 1).bit_length())
+
+    def _scratch_surface(self, w, h):
+        """Return a pooled alpha surface of at least (w, h); callers use only its (0, 0, w, h) area.
+
+        The pool holds one surface per power-of-two size bucket. Primitives
+        fill, use and release it within a single call, so it is never shared.
+        """
+        key = (self._scratch_bucket(w), self._scratch_bucket(h))
+        surface = self._scratch_pool.get(key)
+        if surface is None:
+            surface = pygame.Surface(key, pygame.SRCALPHA)
+            self._scratch_pool[key] = surface
+            self.stats["scratch_allocations"] += 1
+        else:
+            self.stats["scratch_reuses"] += 1
+        return surface
+
+    def _trim_scratch_pool(self):
+        """Drop scratch surfaces larger than the window could need."""
+        max_w, max_h = self._scratch_bucket(self.width), self._scratch_bucket(self.height)
+        for key in [key for key in self._scratch_pool if key[0] > max_w or key[1] > max_h]:
+            del self._scratch_pool[key]
+
+    def _blit_translucent_rect(self, rect, color: Color):
+        """Alpha-blend a solid color over a screen rectangle using a scratch surface."""
+        rect = rect.clip(self.screen.get_rect())
+        if rect.w <= 0 or rect.h <= 0:
+            return
+        temp = self._scratch_surface(rect.w, rect.h)
+        area = pygame.Rect(0, 0, rect.w, rect.h)
+        temp.fill(color.to_tuple(), area)
+        self.screen.blit(temp, rect.topleft, area)
+
     # ---------------- Drawing Methods ----------------
     def clear(self, color=Color(255, 255, 255)):
         """Clear the screen with a color."""
         if color.a == 255:
             self.screen.fill(color.rgb_tuple())
         else:
-            temp = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-            temp.fill(color.to_tuple())
-            self.screen.blit(temp, (0, 0))
+            self._blit_translucent_rect(self.screen.get_rect(), color)
 
     def fill_rect(self, x1, y1, x2, y2, color: Color, outline_thickness=0, outline_color: Color = None):
         """Draw a filled rectangle with optional outline."""
-        outline_thickness = int(outline_thickness)
+        outline_thickness = int(outline_thickness * self._render_scale)
         left, right = min(x1, x2), max(x1, x2)
         bottom, top = min(y1, y2), max(y1, y2)
         sx1, sy1 = self.panda2d_to_pygame(left, bottom)
@@ -477,9 +1632,7 @@ class PandaWindow:
         if color.a == 255:
             pygame.draw.rect(self.screen, color.rgb_tuple(), rect)
         else:
-            temp = pygame.Surface((w, h), pygame.SRCALPHA)
-            temp.fill(color.to_tuple())
-            self.screen.blit(temp, (px, py))
+            self._blit_translucent_rect(rect, color)
         if outline_thickness > 0 and outline_color:
             col = outline_color.rgb_tuple() if outline_color.a == 255 else outline_color.to_tuple()
             pygame.draw.rect(self.screen, col, rect, outline_thickness)
@@ -565,7 +1718,7 @@ class PandaWindow:
         sx1, sy1 = self.panda2d_to_pygame(x1, y1)
         sx2, sy2 = self.panda2d_to_pygame(x2, y2)
         col = color.rgb_tuple() if color.a == 255 else color.to_tuple()
-        pygame.draw.line(self.screen, col, (sx1, sy1), (sx2, sy2), max(1, int(thickness)))
+        pygame.draw.line(self.screen, col, (sx1, sy1), (sx2, sy2), max(1, int(thickness * self._render_scale)))
 
     def draw_text(self, text, font: Font, x, y, anchor=Anchor.CENTER, color: Color = None):
         """Draw text at a given position with anchor and color."""
@@ -575,27 +1728,78 @@ class PandaWindow:
         px, py = self._get_anchor_pos(x, y, surf.get_width(), surf.get_height(), anchor)
         self.screen.blit(surf, (px, py))
 
-    def draw_image(self, image: Image, x, y, anchor=Anchor.CENTER, xscale=1.0, yscale=1.0,
-                   outline_thickness=0, outline_color: Color = None, filter: Color = Color(255, 255, 255, 255), rotation: int = 0):
-        """Draw an image at a given position with scaling, color filter, and optional outline."""
-        outline_thickness = int(outline_thickness)
-        w = max(1, int(image.surface.get_width() * xscale))
-        h = max(1, int(image.surface.get_height() * yscale))
-        img = pygame.transform.scale(image.surface, (w, h))
+    def _scale_surface(self, surface, size):
+        """Scale a surface, using smoothscale when the quality tier allows it."""
+        if self.quality.get("smooth_scale", False):
+            try:
+                return pygame.transform.smoothscale(surface, size)
+            except ValueError:
+                pass  # smoothscale needs 24/32-bit surfaces
+        return pygame.transform.scale(surface, size)
+
+    def _transform_image(self, image: Image, w, h, filter: Color, rotation):
+        """Return the scaled, filtered and rotated surface for an image, cached by rotation bucket."""
+        steps = self.quality.get("rotation_steps", 360)
+        bucket = int(round(rotation * steps / 360.0)) % steps
+        filter_key = filter.to_tuple() if filter is not None else None
+        if bucket == 0 and filter_key in (None, (255, 255, 255, 255)) and (w, h) == image.surface.get_size():
+            return image.surface
+        key = (image.key, w, h, filter_key, bucket)
+        img = self._cached_sprite(key)
+        if img is not None:
+            return img
+        source = image.mip_level(w, h)
+        img = source if source.get_size() == (w, h) else self._scale_surface(source, (w, h))
         # Apply color filter with transparency
         if filter is not None and (filter.r != 255 or filter.g != 255 or filter.b != 255 or filter.a != 255):
-            filter_surf = pygame.Surface((w, h), pygame.SRCALPHA)
-            filter_surf.fill(filter.to_tuple())
+            area = pygame.Rect(0, 0, w, h)
+            filter_surf = self._scratch_surface(w, h)
+            filter_surf.fill(filter.to_tuple(), area)
             img = img.copy()
-            img.blit(filter_surf, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+            img.blit(filter_surf, (0, 0), area, special_flags=pygame.BLEND_RGBA_MULT)
             if filter.a < 255:
-                alpha_surf = pygame.Surface((w, h), pygame.SRCALPHA)
-                alpha_surf.fill((255, 255, 255, filter.a))
-                img.blit(alpha_surf, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+                filter_surf.fill((255, 255, 255, filter.a), area)
+                img.blit(filter_surf, (0, 0), area, special_flags=pygame.BLEND_RGBA_MULT)
         # Apply rotation if needed
-        if rotation != 0:
-            img = pygame.transform.rotate(img, -rotation)  # Pygame rotates counterclockwise, so negate for clockwise
-            w, h = img.get_width(), img.get_height()
+        if bucket != 0:
+            img = pygame.transform.rotate(img, -bucket * 360.0 / steps)  # Pygame rotates counterclockwise, so negate for clockwise
+        self._cache_sprite(key, img)
+        return img
+
+    def _cached_sprite(self, key):
+        """Return a cached surface (marking it recently used), or None."""
+        surface = self._sprite_cache.get(key)
+        if surface is not None:
+            self._sprite_cache.move_to_end(key)
+        return surface
+
+    def _cache_sprite(self, key, surface):
+        """Store a transformed surface, evicting the least recently used ones past the sprite or pixel limit."""
+        cache = self._sprite_cache
+        cache[key] = surface
+        self._sprite_cache_pixels += surface.get_width() * surface.get_height()
+        while len(cache) > 1 and (len(cache) > self._sprite_cache_limit
+                                  or self._sprite_cache_pixels > self._sprite_cache_pixel_limit):
+            _, evicted = cache.popitem(last=False)
+            self._sprite_cache_pixels -= evicted.get_width() * evicted.get_height()
+
+    def _clear_sprite_cache(self):
+        self._sprite_cache.clear()
+        self._sprite_cache_pixels = 0
+
+    def render_text(self, text, font: Font, color: Color = None) -> Image:
+        """Render text once into an Image that can be drawn repeatedly with draw_image."""
+        col = color.rgb_tuple() if (color and color.a == 255) else (color.to_tuple() if color else (0, 0, 0))
+        return Image.from_surface(font.font.render(text, True, col))
+
+    def draw_image(self, image: Image, x, y, anchor=Anchor.CENTER, xscale=1.0, yscale=1.0,
+                   outline_thickness=0, outline_color: Color = None, filter: Color = Color(255, 255, 255, 255), rotation: int = 0):
+        """Draw an image at a given position with scaling, color filter, and optional outline."""
+        outline_thickness = int(outline_thickness * self._render_scale)
+        w = max(1, int(image.surface.get_width() * xscale * self._render_scale))
+        h = max(1, int(image.surface.get_height() * yscale * self._render_scale))
+        img = self._transform_image(image, w, h, filter, rotation)
+        w, h = img.get_width(), img.get_height()
         # Convert anchor position from Panda2D to Pygame coordinates
         px, py = self._get_anchor_pos(x, y, w, h, anchor)
         self.screen.blit(img, (px, py))
@@ -603,13 +1807,81 @@ class PandaWindow:
             col = outline_color.rgb_tuple() if outline_color.a == 255 else outline_color.to_tuple()
             pygame.draw.rect(self.screen, col, pygame.Rect(px, py, w, h), outline_thickness)
 
-    def play_sound(self, sound: Sound):
-        """Play a sound effect."""
-        if sound and sound.sound:
-            try:
-                sound.sound.play()
-            except Exception:
-                pass
+    def draw_scene(self, root: SceneNode, camera: Camera = None):
+        """Draw a scene graph through a camera, culling nodes outside the view."""
+        camera = camera or self.camera
+        nodes = root.collect()
+        if not nodes:
+            return
+        transforms = [node.world_transform() for node in nodes]
+        xs = [t[0] for t in transforms]
+        ys = [t[1] for t in transforms]
+        radii = [node.world_radius() for node in nodes]
+        visible = camera.visible_mask(xs, ys, np.asarray(radii)).tolist()
+        screen_xs, screen_ys = camera.world_to_screen_array(xs, ys)
+        factor = camera.factor
+        white = Color(255, 255, 255, 255)
+        for node, (_, _, rotation, scale), x, y, shown in zip(nodes, transforms, screen_xs.tolist(), screen_ys.tolist(), visible):
+            if shown:
+                self.draw_image(node.image, x, y, anchor=Anchor.CENTER, xscale=scale * factor, yscale=scale * factor,
+                                filter=node.filter or white, rotation=rotation)
+
+    def draw_points(self, xs, ys, color: Color, size: int = 3):
+        """Draw many small squares centered on Panda2D coordinate arrays in one batched blit."""
+        if len(xs) == 0:
+            return
+        s = self._render_scale
+        size = max(1, int(size * s))
+        key = ("point", color.to_tuple(), size)
+        dot = self._cached_sprite(key)
+        if dot is None:
+            dot = pygame.Surface((size, size), pygame.SRCALPHA)
+            dot.fill(color.to_tuple())
+            self._cache_sprite(key, dot)
+        ox, oy = self._anchor_offset
+        pxs = (np.asarray(xs) * s + (ox - size // 2)).astype(int).tolist()
+        pys = (oy - size // 2 - np.asarray(ys) * s).astype(int).tolist()
+        blits = getattr(self.screen, "fblits", self.screen.blits)
+        blits([(dot, pos) for pos in zip(pxs, pys)])
+
+    def draw_particles(self, xs, ys, sizes, palette, colors, alphas, size_step: int = 2, alpha_levels: int = 4):
+        """Draw round particles from Panda2D coordinate arrays in one batched blit.
+
+        sizes are diameters in pixels, colors index into palette (a list of
+        Color) and alphas scale each color's alpha. Sizes and alphas are
+        quantized, so particles share a small cache of pre-tinted sprites.
+        """
+        if len(xs) == 0:
+            return
+        s = self._render_scale
+        steps = np.clip(np.rint(np.asarray(sizes) * s / size_step), 1, 4095).astype(np.int64)
+        levels = np.clip(np.ceil(np.asarray(alphas) * alpha_levels), 1, alpha_levels).astype(np.int64)
+        keys = (np.asarray(colors, dtype=np.int64) * 4096 + steps) * (alpha_levels + 1) + levels
+        unique, inverse = np.unique(keys, return_inverse=True)
+        sprites, offsets = [], []
+        for key in unique.tolist():
+            rest, level = divmod(key, alpha_levels + 1)
+            color_index, step = divmod(rest, 4096)
+            size = step * size_step
+            cache_key = ("particle", palette[color_index].to_tuple(), size, level, alpha_levels)
+            sprite = self._cached_sprite(cache_key)
+            if sprite is None:
+                color = palette[color_index]
+                sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+                pygame.draw.circle(sprite, (color.r, color.g, color.b, color.a * level // alpha_levels),
+                                   (size / 2, size / 2), size / 2)
+                self._cache_sprite(cache_key, sprite)
+            sprites.append(sprite)
+            offsets.append(size // 2)
+        ox, oy = self._anchor_offset
+        pxs = (np.asarray(xs) * s + ox).astype(int).tolist()
+        pys = (oy - np.asarray(ys) * s).astype(int).tolist()
+        blits = getattr(self.screen, "fblits", self.screen.blits)
+        blits([(sprites[i], (x - offsets[i], y - offsets[i])) for i, x, y in zip(inverse.tolist(), pxs, pys)])
+
+    def play_sound(self, sound: Sound, x: float = None, y: float = None):
+        """Play a sound effect through the sound engine, positioned in world space when x and y are given."""
+        return self.sound_engine.play(sound, x, y)
 
 
     def fill_polygon(self, xlist, ylist, color: Color, outline_thickness=0, outline_color: Color = None):
@@ -620,18 +1892,21 @@ class PandaWindow:
         if color.a == 255:
             pygame.draw.polygon(self.screen, color.rgb_tuple(), points, 0)
         else:
-            # Create a temporary surface for alpha blending
+            # Draw into a pooled scratch surface covering the on-screen part of the polygon
             min_x = min(p[0] for p in points)
             min_y = min(p[1] for p in points)
             max_x = max(p[0] for p in points)
             max_y = max(p[1] for p in points)
-            w = max_x - min_x + 1
-            h = max_y - min_y + 1
-            temp = pygame.Surface((w, h), pygame.SRCALPHA)
-            shifted_points = [(p[0] - min_x, p[1] - min_y) for p in points]
-            temp.fill((0, 0, 0, 0))
-            pygame.draw.polygon(temp, color.to_tuple(), shifted_points, 0)
-            self.screen.blit(temp, (min_x, min_y))
+            bounds = pygame.Rect(min_x, min_y, max_x - min_x + 1, max_y - min_y + 1).clip(self.screen.get_rect())
+            if bounds.w > 0 and bounds.h > 0:
+                temp = self._scratch_surface(bounds.w, bounds.h)
+                area = pygame.Rect(0, 0, bounds.w, bounds.h)
+                temp.fill((0, 0, 0, 0), area)
+                shifted_points = [(p[0] - bounds.x, p[1] - bounds.y) for p in points]
+                temp.set_clip(area)
+                pygame.draw.polygon(temp, color.to_tuple(), shifted_points, 0)
+                temp.set_clip(None)
+                self.screen.blit(temp, bounds.topleft, area)
         if outline_thickness > 0 and outline_color:
             col = outline_color.rgb_tuple() if outline_color.a == 255 else outline_color.to_tuple()
-            pygame.draw.polygon(self.screen, col, points, outline_thickness)
+            pygame.draw.polygon(self.screen, col, points, max(1, int(outline_thickness * self._render_scale)))
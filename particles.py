@@ -0,0 +1,166 @@
+import math
+
+import numpy as np
+
+
+class ParticlePool:
+    """Fixed-capacity particle storage backed by NumPy arrays.
+
+    Works like ProjectilePool: slots come from a preallocated free stack
+    and update and expiry are vectorized. On top of the capacity, at most
+    max_emit_per_frame particles are spawned between begin_frame() calls,
+    so effects have a hard per-frame cost ceiling however busy the battle is.
+    """
+
+    def __init__(self, capacity: int = 4096, max_emit_per_frame: int = 256, drag: float = 1.5):
+        self.capacity = capacity
+        self.max_emit_per_frame = max_emit_per_frame
+        self.drag = drag  # Velocity decay per second (exponential)
+        self.position_x = np.zeros(capacity, dtype=np.float32)
+        self.position_y = np.zeros(capacity, dtype=np.float32)
+        self.velocity_x = np.zeros(capacity, dtype=np.float32)
+        self.velocity_y = np.zeros(capacity, dtype=np.float32)
+        self.age = np.zeros(capacity, dtype=np.float32)
+        self.lifetime = np.ones(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.growth = np.zeros(capacity, dtype=np.float32)  # Size change per second
+        self.color = np.zeros(capacity, dtype=np.uint8)  # Palette index
+        self.active = np.zeros(capacity, dtype=bool)
+
+        self._free = np.arange(capacity - 1, -1, -1, dtype=np.int32)
+        self._free_count = capacity
+        self._budget = max_emit_per_frame
+        self.rng = np.random.default_rng()
+
+    @property
+    def count(self):
+        """Number of live particles."""
+        return self.capacity - self._free_count
+
+    def begin_frame(self):
+        """Refill the per-frame emission budget."""
+        self._budget = self.max_emit_per_frame
+
+    def emit(self, xs, ys, velocity_xs, velocity_ys, lifetime, size, color, growth=0.0):
+        """Spawn particles from arrays; return how many fit in the pool and this frame's budget.
+
+        lifetime, size, color and growth may be scalars or per-particle arrays.
+        """
+        n = min(len(xs), self._free_count, self._budget)
+        if n <= 0:
+            return 0
+        slots = self._free[self._free_count - n:self._free_count]
+        self._free_count -= n
+        self._budget -= n
+        self.position_x[slots] = xs[:n]
+        self.position_y[slots] = ys[:n]
+        self.velocity_x[slots] = velocity_xs[:n]
+        self.velocity_y[slots] = velocity_ys[:n]
+        self.age[slots] = 0
+        for array, value in ((self.lifetime, lifetime), (self.size, size), (self.color, color), (self.growth, growth)):
+            array[slots] = value[:n] if np.ndim(value) else value
+        self.active[slots] = True
+        return n
+
+    def burst(self, x: float, y: float, count: int, speed: float, lifetime: float, size: float, color: int,
+              radius: float = 0.0, growth: float = 0.0):
+        """Emit count particles flying out of a disk around (x, y) at random angles and speeds."""
+        rng = self.rng
+        count = min(count, self._budget)
+        if count <= 0:
+            return 0
+        angles = rng.uniform(0, 2 * math.pi, count)
+        speeds = rng.uniform(0.2, 1.0, count) * speed
+        offsets = np.sqrt(rng.uniform(0, 1, count)) * radius
+        sin, cos = np.sin(angles), np.cos(angles)
+        return self.emit(
+            x + sin * offsets, y + cos * offsets, sin * speeds, cos * speeds,
+            rng.uniform(0.6, 1.0, count) * lifetime, rng.uniform(0.7, 1.3, count) * size, color, growth,
+        )
+
+    def _release(self, slots):
+        n = len(slots)
+        if n == 0:
+            return
+        self.active[slots] = False
+        self._free[self._free_count:self._free_count + n] = slots
+        self._free_count += n
+
+    def update(self, deltatime: float):
+        """Integrate live particles and expire the ones that outlived their lifetime."""
+        if self._free_count == self.capacity:
+            return
+        active = self.active
+        self.position_x[active] += self.velocity_x[active] * deltatime
+        self.position_y[active] += self.velocity_y[active] * deltatime
+        decay = math.exp(-self.drag * deltatime)
+        self.velocity_x[active] *= decay
+        self.velocity_y[active] *= decay
+        self.size[active] += self.growth[active] * deltatime
+        self.age[active] += deltatime
+        self._release(np.flatnonzero(active & ((self.age >= self.lifetime) | (self.size <= 0))))
+
+    def live(self):
+        """Return (x, y, size, color, alpha) arrays of live particles; alpha fades from 1 to 0 with age."""
+        active = self.active
+        alpha = 1.0 - self.age[active] / self.lifetime[active]
+        return self.position_x[active], self.position_y[active], self.size[active], self.color[active], alpha
+
+
+class WakeEmitter:
+    """Sheds foam behind a unit at a rate proportional to its speed.
+
+    offset is the emission point along the unit's heading (negative is the
+    stern). Fractional particles carry over between frames.
+    """
+
+    def __init__(self, offset: float, rate: float = 30, reference_speed: float = 50, lifetime: float = 1.6,
+                 size: float = 6, spread: float = 8, color: int = 0):
+        self.offset = offset
+        self.rate = rate  # Particles per second at reference_speed
+        self.reference_speed = reference_speed
+        self.lifetime = lifetime
+        self.size = size
+        self.spread = spread  # Sideways scatter in world units
+        self.color = color
+        self._carry = 0.0
+
+    def pending(self, unit, deltatime: float) -> int:
+        """Return how many particles the unit sheds this frame."""
+        speed = math.hypot(unit.velocity_x, unit.velocity_y)
+        self._carry += self.rate * min(speed / self.reference_speed, 2.0) * deltatime
+        count = int(self._carry)
+        self._carry -= count
+        return count
+
+
+def emit_wakes(pool: ParticlePool, units, deltatime: float):
+    """Emit the wakes of every unit with a wake emitter in one vectorized batch."""
+    xs, ys, headings, emitters = [], [], [], []
+    for unit in units:
+        emitter = unit.wake_emitter
+        if emitter is None:
+            continue
+        for _ in range(emitter.pending(unit, deltatime)):
+            xs.append(unit.position_x)
+            ys.append(unit.position_y)
+            headings.append(unit.direction)
+            emitters.append(emitter)
+    if not xs:
+        return 0
+    n = len(xs)
+    rng = pool.rng
+    heading = np.radians(headings)
+    sin, cos = np.sin(heading), np.cos(heading)
+
+    def field(name):
+        return np.array([getattr(emitter, name) for emitter in emitters])
+
+    offsets = field("offset")
+    spread = field("spread") * rng.uniform(-1, 1, n)
+    # Along the heading by the offset, then sideways by the spread
+    xs = np.array(xs) + sin * offsets + cos * spread
+    ys = np.array(ys) + cos * offsets - sin * spread
+    drift = rng.uniform(-1, 1, n) * 6
+    size = field("size")
+    return pool.emit(xs, ys, cos * drift, -sin * drift, field("lifetime"), size, field("color"), growth=size)
@@ -0,0 +1,117 @@
+import numpy as np
+
+
+def resolve_damage(damage, defense):
+    """Reduce raw damage by the target's defense (100 defense halves damage)."""
+    return damage * 100.0 / (100.0 + defense)
+
+
+class ProjectilePool:
+    """Fixed-capacity projectile storage backed by NumPy arrays.
+
+    Slots are handed out from a preallocated free stack, so firing never
+    allocates; when the pool is full new shots are dropped.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self.position_x = np.zeros(capacity, dtype=np.float32)
+        self.position_y = np.zeros(capacity, dtype=np.float32)
+        self.velocity_x = np.zeros(capacity, dtype=np.float32)
+        self.velocity_y = np.zeros(capacity, dtype=np.float32)
+        self.lifetime = np.zeros(capacity, dtype=np.float32)
+        self.owner_team = np.full(capacity, -1, dtype=np.int32)
+        self.damage = np.zeros(capacity, dtype=np.float32)
+        self.active = np.zeros(capacity, dtype=bool)
+
+        # Free slots live in _free[:_free_count]; popping takes from the end
+        self._free = np.arange(capacity - 1, -1, -1, dtype=np.int32)
+        self._free_count = capacity
+
+    @property
+    def count(self):
+        """Number of live projectiles."""
+        return self.capacity - self._free_count
+
+    def fire(self, x, y, velocity_x, velocity_y, lifetime, owner_team, damage):
+        """Spawn one projectile; return its slot or -1 when the pool is full."""
+        if self._free_count == 0:
+            return -1
+        self._free_count -= 1
+        slot = self._free[self._free_count]
+        self.position_x[slot] = x
+        self.position_y[slot] = y
+        self.velocity_x[slot] = velocity_x
+        self.velocity_y[slot] = velocity_y
+        self.lifetime[slot] = lifetime
+        self.owner_team[slot] = owner_team
+        self.damage[slot] = damage
+        self.active[slot] = True
+        return slot
+
+    def fire_salvo(self, xs, ys, velocity_xs, velocity_ys, lifetime, owner_team, damage):
+        """Spawn many projectiles at once from arrays; return how many were spawned."""
+        n = min(len(xs), self._free_count)
+        if n == 0:
+            return 0
+        slots = self._free[self._free_count - n:self._free_count]
+        self._free_count -= n
+        self.position_x[slots] = xs[:n]
+        self.position_y[slots] = ys[:n]
+        self.velocity_x[slots] = velocity_xs[:n]
+        self.velocity_y[slots] = velocity_ys[:n]
+        self.lifetime[slots] = lifetime
+        self.owner_team[slots] = owner_team
+        self.damage[slots] = damage
+        self.active[slots] = True
+        return n
+
+    def _release(self, slots):
+        """Return slots to the free stack."""
+        n = len(slots)
+        if n == 0:
+            return
+        self.active[slots] = False
+        self.owner_team[slots] = -1
+        self._free[self._free_count:self._free_count + n] = slots
+        self._free_count += n
+
+    def update(self, deltatime: float):
+        """Integrate live projectiles and expire the ones whose lifetime ran out."""
+        active = self.active
+        self.position_x[active] += self.velocity_x[active] * deltatime
+        self.position_y[active] += self.velocity_y[active] * deltatime
+        self.lifetime[active] -= deltatime
+        self._release(np.flatnonzero(active & (self.lifetime <= 0)))
+
+    def resolve_hits(self, unit_x, unit_y, unit_radius, unit_team, unit_defense, chunk: int = 2048):
+        """Test live projectiles against unit bounding circles and consume the ones that hit.
+
+        All unit arguments are arrays of equal length. Projectiles never hit
+        their own team. Returns the damage dealt to each unit after defense.
+        """
+        damage_taken = np.zeros(len(unit_x), dtype=np.float32)
+        slots = np.flatnonzero(self.active)
+        if len(slots) == 0 or len(unit_x) == 0:
+            return damage_taken
+        radius_sq = np.asarray(unit_radius, dtype=np.float32) ** 2
+        # Work in chunks so the projectile x unit distance matrix stays bounded
+        for start in range(0, len(slots), chunk):
+            part = slots[start:start + chunk]
+            dx = self.position_x[part, None] - unit_x[None, :]
+            dy = self.position_y[part, None] - unit_y[None, :]
+            hits = (dx * dx + dy * dy <= radius_sq[None, :]) & (self.owner_team[part, None] != unit_team[None, :])
+            hit_any = hits.any(axis=1)
+            if not hit_any.any():
+                continue
+            # Each projectile damages the first unit it overlaps
+            targets = hits[hit_any].argmax(axis=1)
+            hit_slots = part[hit_any]
+            np.add.at(damage_taken, targets, resolve_damage(self.damage[hit_slots], unit_defense[targets]))
+            self._release(hit_slots)
+        return damage_taken
+
+    def live(self):
+        """Return (x, y) arrays of live projectile positions."""
+        active = self.active
+        return self.position_x[active], self.position_y[active]
@@ -0,0 +1,299 @@
+"""Run the game simulation in a child process and share its state over shared memory.
+
+The child owns the authoritative game state. After every tick it
+publishes a snapshot of all units, live projectiles and the selected
+unit's waypoint queue into one of two
+shared-memory slots. Each slot has a sequence number that is odd while
+the slot is being written. The render process reads the newest complete
+slot, mirrors it into its own units and forwards input snapshots back
+over a queue. Simulation and rendering therefore overlap on separate
+cores instead of running back to back.
+"""
+import multiprocessing
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+TICK_RATE = 60
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Keys read by the simulation; everything else (camera, fog view, capture) stays in the render process
+SIM_KEYS = ("W", "A", "S", "D", "SPACE", "LSHIFT", "RSHIFT", "P")
+
+# Unit classes by snapshot kind index (names in the units module)
+UNIT_KINDS = ("Battleship",)
+
+UNIT_DTYPE = np.dtype([
+    ("id", np.int64),
+    ("kind", np.int16),
+    ("team", np.int16),
+    ("x", np.float32),
+    ("y", np.float32),
+    ("direction", np.float32),
+    ("health", np.float32),
+    ("target_x", np.float32),
+    ("target_y", np.float32),
+    ("autonomous", np.bool_),
+])
+
+# Per-slot header: tick, tick time in microseconds, unit count, projectile count, selected unit id,
+# selected unit's waypoint count and patrol flag
+_HEADER_FIELDS = 7
+
+
+def unit_class(kind: int):
+    import units
+    return getattr(units, UNIT_KINDS[kind])
+
+
+def unit_kind(unit) -> int:
+    return UNIT_KINDS.index(type(unit).__name__)
+
+
+class Snapshot:
+    """Copy of one published simulation tick."""
+
+    def __init__(self, tick, tick_ms, units, selected_id, projectile_x, projectile_y, waypoints=None, patrol=False):
+        self.tick = tick
+        self.tick_ms = tick_ms
+        self.units = units
+        self.selected_id = selected_id
+        self.projectile_x = projectile_x
+        self.projectile_y = projectile_y
+        # The selected unit's queued waypoints as an (n, 2) array, and whether they loop
+        self.waypoints = waypoints if waypoints is not None else np.zeros((0, 2), dtype=np.float32)
+        self.patrol = patrol
+
+
+class SharedSnapshot:
+    """Double-buffered simulation snapshots in one shared-memory block.
+
+    A single writer alternates between the two slots, so it always
+    overwrites the older one while readers copy the newer one. A reader
+    re-checks the slot's sequence number after copying and retries if
+    the writer lapped it.
+    """
+
+    def __init__(self, unit_capacity: int = 1024, projectile_capacity: int = 4096, name: str = None,
+                 waypoint_capacity: int = 4096):
+        self.unit_capacity = unit_capacity
+        self.projectile_capacity = projectile_capacity
+        self.waypoint_capacity = waypoint_capacity
+        header_size = _HEADER_FIELDS * 8
+        units_size = unit_capacity * UNIT_DTYPE.itemsize
+        projectiles_size = projectile_capacity * 4
+        waypoints_size = waypoint_capacity * 2 * 4
+        # Keep every array 8-byte aligned
+        units_size += -units_size % 8
+        projectiles_size += -projectiles_size % 8
+        slot_size = header_size + units_size + 2 * projectiles_size + waypoints_size
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=16 + 2 * slot_size)
+        buffer = self.shm.buf
+        self.sequence = np.ndarray(2, dtype=np.int64, buffer=buffer)
+        self._slots = []
+        for slot in range(2):
+            offset = 16 + slot * slot_size
+            header = np.ndarray(_HEADER_FIELDS, dtype=np.int64, buffer=buffer, offset=offset)
+            offset += header_size
+            units = np.ndarray(unit_capacity, dtype=UNIT_DTYPE, buffer=buffer, offset=offset)
+            offset += units_size
+            projectile_x = np.ndarray(projectile_capacity, dtype=np.float32, buffer=buffer, offset=offset)
+            offset += projectiles_size
+            projectile_y = np.ndarray(projectile_capacity, dtype=np.float32, buffer=buffer, offset=offset)
+            offset += projectiles_size
+            waypoints = np.ndarray((waypoint_capacity, 2), dtype=np.float32, buffer=buffer, offset=offset)
+            self._slots.append((header, units, projectile_x, projectile_y, waypoints))
+        self._published = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def publish(self, tick: int, tick_ms: float, rows, selected_id: int, projectile_x, projectile_y,
+                waypoints=(), patrol: bool = False):
+        """Write one tick (rows are UNIT_DTYPE tuples) into the older slot.
+
+        waypoints are the selected unit's queued (x, y) points. Raises
+        ValueError when there are more units than the buffer holds; readers
+        treat a missing unit as sunk, so they are never dropped. Projectiles
+        and waypoints past capacity are only left undrawn.
+        """
+        if len(rows) > self.unit_capacity:
+            raise ValueError(f"{len(rows)} units exceed the snapshot capacity of {self.unit_capacity}")
+        self._published += 1
+        slot = self._published % 2
+        header, units, xs, ys, path = self._slots[slot]
+        self.sequence[slot] = 2 * self._published - 1  # odd: write in progress
+        unit_count = len(rows)
+        projectile_count = min(len(projectile_x), self.projectile_capacity)
+        units[:unit_count] = rows
+        xs[:projectile_count] = projectile_x[:projectile_count]
+        ys[:projectile_count] = projectile_y[:projectile_count]
+        waypoint_count = min(len(waypoints), self.waypoint_capacity)
+        if waypoint_count:
+            path[:waypoint_count] = waypoints[:waypoint_count]
+        header[:] = (tick, int(tick_ms * 1000), unit_count, projectile_count, selected_id, waypoint_count, patrol)
+        self.sequence[slot] = 2 * self._published
+
+    def read(self, retries: int = 4):
+        """Return a copy of the newest complete snapshot, or None before the first tick."""
+        for _ in range(retries):
+            first, second = self.sequence.tolist()
+            slot = 0 if first > second else 1
+            sequence = max(first, second)
+            if sequence % 2:
+                # Newest slot is mid-write; the other one is complete
+                slot, sequence = 1 - slot, min(first, second)
+            if sequence == 0:
+                return None
+            header, units, xs, ys, path = self._slots[slot]
+            tick, tick_us, unit_count, projectile_count, selected_id, waypoint_count, patrol = header.tolist()
+            snapshot = Snapshot(tick, tick_us / 1000.0, units[:unit_count].copy(), selected_id,
+                                xs[:projectile_count].copy(), ys[:projectile_count].copy(),
+                                path[:waypoint_count].copy(), bool(patrol))
+            if self.sequence[slot] == sequence:
+                return snapshot
+        return None
+
+    def close(self, unlink: bool = False):
+        # Drop our array views first; the buffer cannot close while they are exported
+        self.sequence = None
+        self._slots = []
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def _merge_inputs(inputs, previous):
+    """Drain the input queue into one snapshot, keeping brief key presses and clicks."""
+    merged = None
+    while True:
+        try:
+            latest = inputs.get_nowait()
+        except queue.Empty:
+            break
+        if merged is None:
+            merged = latest
+            continue
+        merged = dict(
+            latest,
+            keys=sorted(set(merged["keys"]) | set(latest["keys"])),
+            buttons=tuple(a or b for a, b in zip(merged["buttons"], latest["buttons"])),
+        )
+    return merged if merged is not None else previous
+
+
+def _make_simulation_window():
+    import app
+
+    class SimulationWindow(app.GameWindow):
+        """Headless GameWindow that ticks the simulation from forwarded input."""
+
+        def apply_input(self, inputs):
+            if inputs is None:
+                return
+            self.input_keys = set(inputs["keys"])
+            self.mousex, self.mousey = inputs["mouse"]
+            self.mousedownprimary, self.mousedownmiddle, self.mousedownsecondary = inputs["buttons"]
+            x, y, zoom, scale, width, height = inputs["camera"]
+            self.camera.resize(width, height)
+            self.camera.x, self.camera.y, self.camera.zoom, self.camera.scale = x, y, zoom, scale
+
+        def keydown(self, key):
+            return key.name in self.input_keys
+
+        def publish(self, snapshot, tick, tick_ms):
+            team_id = self.team_registry.team_id
+            rows = [
+                (unit.id, unit_kind(unit), team_id(unit.team), unit.position_x, unit.position_y, unit.direction,
+                 unit.health, unit.autonomous_target_x, unit.autonomous_target_y, unit.autonomous)
+                for unit in self.units
+            ]
+            handle = self.selected_unit_handle
+            selected = self.entities.get(handle)
+            selected = selected.id if selected is not None else -1
+            projectile_x, projectile_y = self.projectiles.live()
+            snapshot.publish(tick, tick_ms, rows, selected, projectile_x, projectile_y,
+                             self.waypoints.points(handle), self.waypoints.patrolling(handle))
+
+    return SimulationWindow
+
+
+def _run_simulation(name, unit_capacity, projectile_capacity, waypoint_capacity, inputs, stop, tick_rate):
+    """Child process entry point: tick at a fixed rate until stop is set."""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    # SDL would otherwise trap SIGTERM, and terminate() could never stop the child
+    os.environ["SDL_NO_SIGNAL_HANDLERS"] = "1"
+    os.chdir(GAME_DIR)
+    snapshot = SharedSnapshot(unit_capacity, projectile_capacity, name=name, waypoint_capacity=waypoint_capacity)
+    window = _make_simulation_window()()
+    window.initialize()
+    window.input_keys = set()
+    window.deltatime = 1.0 / tick_rate
+    state = None
+    tick = 0
+    next_tick = time.perf_counter()
+    try:
+        while not stop.is_set():
+            state = _merge_inputs(inputs, state)
+            window.apply_input(state)
+            started = time.perf_counter()
+            window._update_simulation()
+            tick += 1
+            window.publish(snapshot, tick, (time.perf_counter() - started) * 1000)
+            next_tick += 1.0 / tick_rate
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Fell behind: don't try to catch up with a burst of ticks
+                next_tick = time.perf_counter()
+    finally:
+        snapshot.close()
+
+
+class SimulationProcess:
+    """Parent-side handle of the simulation child process."""
+
+    def __init__(self, unit_capacity: int = 1024, projectile_capacity: int = 4096, tick_rate: int = TICK_RATE,
+                 waypoint_capacity: int = 4096):
+        # Spawn keeps the child free of the parent's pygame display state
+        context = multiprocessing.get_context("spawn")
+        self.snapshot = SharedSnapshot(unit_capacity, projectile_capacity, waypoint_capacity=waypoint_capacity)
+        self.inputs = context.Queue()
+        self._stop = context.Event()
+        self.process = context.Process(
+            target=_run_simulation,
+            args=(self.snapshot.name, unit_capacity, projectile_capacity, waypoint_capacity, self.inputs, self._stop,
+                  tick_rate),
+            daemon=True,
+        )
+        self.process.start()
+
+    @property
+    def alive(self):
+        return self.process.is_alive()
+
+    def send_input(self, inputs: dict):
+        """Forward an input snapshot: keys (SIM_KEYS names), mouse, buttons and camera."""
+        self.inputs.put(inputs)
+
+    def read(self):
+        return self.snapshot.read()
+
+    def close(self):
+        self._stop.set()
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.inputs.cancel_join_thread()
+        self.snapshot.close(unlink=True)
@@ -0,0 +1,139 @@
+import math
+
+import numpy as np
+
+
+class KDTree:
+    """Static 2-D KD-tree built by median splits over point arrays."""
+
+    def __init__(self, xs, ys, leaf_size: int = 8):
+        self.xs = np.asarray(xs, dtype=float)
+        self.ys = np.asarray(ys, dtype=float)
+        self.leaf_size = leaf_size
+        # Queries walk plain lists, which is faster than NumPy scalar indexing
+        self._px = self.xs.tolist()
+        self._py = self.ys.tolist()
+        self._order = []
+        self._nodes = []  # (axis, split, left, right) for branches, (-1, start, end, 0) for leaves
+        if len(self._px):
+            self._build(np.arange(len(self._px)))
+
+    def __len__(self):
+        return len(self._px)
+
+    def _build(self, indices):
+        node = len(self._nodes)
+        self._nodes.append(None)
+        if len(indices) <= self.leaf_size:
+            start = len(self._order)
+            self._order.extend(indices.tolist())
+            self._nodes[node] = (-1, start, len(self._order), 0)
+            return node
+        xs, ys = self.xs[indices], self.ys[indices]
+        axis = 0 if np.ptp(xs) >= np.ptp(ys) else 1
+        coords = xs if axis == 0 else ys
+        mid = len(indices) // 2
+        part = np.argpartition(coords, mid)
+        split = float(coords[part[mid]])
+        left = self._build(indices[part[:mid]])
+        right = self._build(indices[part[mid:]])
+        self._nodes[node] = (axis, split, left, right)
+        return node
+
+    def nearest(self, x: float, y: float, max_distance: float = math.inf, accept=None):
+        """Return (index, distance) of the closest point within max_distance, or (-1, inf).
+
+        accept(index) may reject points; the search then goes on to the
+        next closest instead of giving up.
+        """
+        if not self._nodes:
+            return -1, math.inf
+        px, py, order, nodes = self._px, self._py, self._order, self._nodes
+        best, best_d2 = -1, max_distance * max_distance
+        stack = [0]
+        while stack:
+            axis, a, b, c = nodes[stack.pop()]
+            if axis < 0:
+                for i in order[a:b]:
+                    dx, dy = px[i] - x, py[i] - y
+                    d2 = dx * dx + dy * dy
+                    if d2 < best_d2 and (accept is None or accept(i)):
+                        best, best_d2 = i, d2
+                continue
+            diff = (x if axis == 0 else y) - a
+            near, far = (b, c) if diff < 0 else (c, b)
+            # Visit the far side only if the splitting line is closer than the best hit
+            if diff * diff < best_d2:
+                stack.append(far)
+            stack.append(near)
+        return best, (math.sqrt(best_d2) if best >= 0 else math.inf)
+
+
+class TargetingSystem:
+    """Picks the nearest enemy in weapon range for every unit using per-team KD-trees.
+
+    Trees are rebuilt once per tick. Retargeting is staggered: each tick
+    only one in `stagger` units searches for a new target, with or without
+    a current one. Only units whose target just sank or went out of sight
+    search right away. Every unit with a live target gets its aim refreshed
+    in one vectorized pass.
+    """
+
+    def __init__(self, stagger: int = 4):
+        self.stagger = max(1, stagger)
+        self.tick = 0
+        self._trees = {}
+        self._members = {}
+
+    def _build(self, units, team_id):
+        groups = {}
+        for unit in units:
+            groups.setdefault(team_id(unit.team), []).append(unit)
+        self._members = groups
+        self._trees = {
+            team: KDTree([unit.position_x for unit in members], [unit.position_y for unit in members])
+            for team, members in groups.items()
+        }
+
+    def nearest_enemy(self, unit, team: int, max_distance: float = math.inf, can_see=None):
+        """Return (enemy, distance) of the closest unit of another team, or (None, inf)."""
+        best, best_distance = None, max_distance
+        for enemy_team, tree in self._trees.items():
+            if enemy_team == team:
+                continue
+            members = self._members[enemy_team]
+            accept = None if can_see is None else (lambda index: can_see(team, members[index]))
+            index, distance = tree.nearest(unit.position_x, unit.position_y, best_distance, accept)
+            if index >= 0 and distance < best_distance:
+                best, best_distance = members[index], distance
+        return best, best_distance
+
+    def update(self, units, team_id, can_see=None):
+        """Rebuild the trees, retarget this tick's slot of units and aim everyone at their targets.
+
+        team_id maps a team to its integer id; can_see(team_id, enemy) may veto
+        targets hidden by fog of war.
+        """
+        self._build(units, team_id)
+        slot = self.tick % self.stagger
+        self.tick += 1
+        for index, unit in enumerate(units):
+            target = unit.target
+            lost = target is not None and (not target.alive or (can_see and not can_see(team_id(unit.team), target)))
+            if lost:
+                unit.target = None
+            if lost or index % self.stagger == slot:
+                unit.target, _ = self.nearest_enemy(unit, team_id(unit.team), unit.weapon_range, can_see)
+
+        aiming = [unit for unit in units if unit.target is not None]
+        if not aiming:
+            return
+        target_x = np.array([unit.target.position_x for unit in aiming])
+        target_y = np.array([unit.target.position_y for unit in aiming])
+        dx = target_x - np.array([unit.position_x for unit in aiming])
+        dy = target_y - np.array([unit.position_y for unit in aiming])
+        gun_direction = np.degrees(np.arctan2(dx, dy))
+        for unit, x, y, direction in zip(aiming, target_x.tolist(), target_y.tolist(), gun_direction.tolist()):
+            unit.target_position_x = x
+            unit.target_position_y = y
+            unit.gun_direction = direction
@@ -26,4 +26,113 @@ class GreenSquadron(Team):
     """Represents the Green Squadron team."""
 
     def __init__(self):
-        super().__init__("Green Squadron", Color(0, 255, 0))
\ No newline at end of file
+        super().__init__("Green Squadron", Color(0, 255, 0))
+
+class TeamRegistry:
+    """Incrementally maintained per-team unit membership and aggregate stats.
+
+    `version` changes whenever team membership changes and `health_version`
+    whenever a team's total health changes, so callers can cache anything
+    derived from them. Bounding boxes are recomputed lazily, and only after
+    a unit leaves the box or moves off its edge.
+    """
+
+    def __init__(self, teams):
+        self.teams = list(teams)
+        self._team_ids = {team: index for index, team in enumerate(self.teams)}
+        self._members = {team: {} for team in self.teams}  # unit -> last known (x, y)
+        self._health = {team: 0.0 for team in self.teams}
+        self._bounds = {team: None for team in self.teams}
+        self._bounds_dirty = {team: False for team in self.teams}
+        self.version = 0
+        self.health_version = 0
+
+    def team_id(self, team) -> int:
+        return self._team_ids[team]
+
+    # ---------------- Membership ----------------
+    def add(self, unit):
+        members = self._members[unit.team]
+        if unit in members:
+            return
+        members[unit] = (unit.position_x, unit.position_y)
+        self._health[unit.team] += unit.health
+        self._expand_bounds(unit.team, unit.position_x, unit.position_y)
+        self.version += 1
+        self.health_version += 1
+
+    def remove(self, unit, team=None):
+        team = team if team is not None else unit.team
+        position = self._members[team].pop(unit, None)
+        if position is None:
+            return
+        self._health[team] -= unit.health
+        self._touch_bounds(team, position)
+        self.version += 1
+        self.health_version += 1
+
+    def change_team(self, unit, new_team):
+        """Move a unit to another team, keeping the stats of both in sync."""
+        self.remove(unit)
+        unit.team = new_team
+        self.add(unit)
+
+    # ---------------- Updates ----------------
+    def damage(self, unit, amount: float):
+        """Apply damage to a unit and its team's total health."""
+        if amount:
+            unit.health -= amount
+            self._health[unit.team] -= amount
+            self.health_version += 1
+
+    def move(self, unit):
+        """Record a unit's new position for its team's bounding box."""
+        members = self._members[unit.team]
+        old = members.get(unit)
+        if old is None:
+            return
+        x, y = unit.position_x, unit.position_y
+        if old == (x, y):
+            return
+        members[unit] = (x, y)
+        self._touch_bounds(unit.team, old)
+        self._expand_bounds(unit.team, x, y)
+
+    def _expand_bounds(self, team, x, y):
+        bounds = self._bounds[team]
+        if bounds is None:
+            if not self._bounds_dirty[team]:
+                self._bounds[team] = (x, y, x, y)
+            return
+        left, bottom, right, top = bounds
+        self._bounds[team] = (min(left, x), min(bottom, y), max(right, x), max(top, y))
+
+    def _touch_bounds(self, team, old):
+        # Leaving an edge may shrink the box, which needs a full recompute
+        bounds = self._bounds[team]
+        if bounds is not None and (old[0] in (bounds[0], bounds[2]) or old[1] in (bounds[1], bounds[3])):
+            self._bounds[team] = None
+            self._bounds_dirty[team] = True
+
+    # ---------------- Queries ----------------
+    def units(self, team):
+        return self._members[team].keys()
+
+    def count(self, team) -> int:
+        return len(self._members[team])
+
+    def total_health(self, team) -> float:
+        return self._health[team]
+
+    def bounds(self, team):
+        """Return (left, bottom, right, top) of the team's units, or None if it has none."""
+        if self._bounds_dirty[team]:
+            positions = self._members[team].values()
+            if positions:
+                xs = [x for x, _ in positions]
+                ys = [y for _, y in positions]
+                self._bounds[team] = (min(xs), min(ys), max(xs), max(ys))
+            else:
+                self._bounds[team] = None
+            self._bounds_dirty[team] = False
+        return self._bounds[team]
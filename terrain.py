@@ -0,0 +1,284 @@
+"""Chunked world terrain stored on disk and streamed in around the camera.
+
+A map is a directory holding map.json and one chunk_<cx>_<cy>.npz file per
+authored chunk. Each chunk stores a square grid of tile ids and a matching
+collision mask. Chunks without a file are open water.
+
+Usage:
+    python terrain.py generate maps/archipelago [chunks_x] [chunks_y] [seed]
+"""
+import json
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pygame
+
+from panda2d import Image
+
+MAP_FILE = "map.json"
+
+# Tile ids: 0 is open water and is drawn transparent
+DEFAULT_PALETTE = [
+    [0, 0, 0, 0],          # water
+    [70, 140, 170, 255],   # shallows
+    [214, 196, 140, 255],  # sand
+    [92, 128, 64, 255],    # land
+    [110, 110, 110, 255],  # rock
+]
+DEFAULT_BLOCKING = [2, 3, 4]
+
+
+def chunk_file(path: str, cx: int, cy: int) -> str:
+    return os.path.join(path, f"chunk_{cx}_{cy}.npz")
+
+
+def write_map(path: str, chunk_tiles: int = 16, tile_size: float = 50, palette=None, blocking=None):
+    """Create a map directory and its header."""
+    os.makedirs(path, exist_ok=True)
+    header = {
+        "chunk_tiles": chunk_tiles,
+        "tile_size": tile_size,
+        "palette": palette or DEFAULT_PALETTE,
+        "blocking": blocking if blocking is not None else DEFAULT_BLOCKING,
+    }
+    with open(os.path.join(path, MAP_FILE), "w") as f:
+        json.dump(header, f, indent=2)
+    return header
+
+
+def write_chunk(path: str, cx: int, cy: int, tiles, blocking=None):
+    """Store one chunk; the collision mask is derived from the blocking tile ids."""
+    tiles = np.asarray(tiles, dtype=np.uint8)
+    mask = np.isin(tiles, blocking if blocking is not None else DEFAULT_BLOCKING)
+    np.savez(chunk_file(path, cx, cy), tiles=tiles, mask=mask)
+
+
+class TerrainChunk:
+    """Decoded chunk: tile grid (row 0 is the chunk's bottom edge), collision mask and image."""
+
+    def __init__(self, cx, cy, tiles, mask, pixels):
+        self.cx, self.cy = cx, cy
+        self.tiles = tiles
+        self.mask = mask
+        self._pixels = pixels
+        self._image = None
+
+    @property
+    def image(self):
+        # Surfaces are created on the main thread, on first draw
+        if self._image is None:
+            h, w = self._pixels.shape[:2]
+            surface = pygame.image.frombuffer(self._pixels.tobytes(), (w, h), "RGBA").convert_alpha()
+            self._image = Image.from_surface(surface)
+            self._pixels = None
+        return self._image
+
+
+class TerrainStreamer:
+    """Streams terrain chunks around the camera with a bounded LRU cache.
+
+    Chunks in and around the view are read and decoded on a background
+    thread. At most cache_size decoded chunks are kept, but the limit grows
+    to the size of the load range so chunks still in range are never
+    evicted. Chunks further than evict_margin chunks outside the view are
+    dropped. Collision masks are cached separately, because ships far from
+    the camera still need them. They are read on their own background
+    thread, so they never wait behind chunk decodes; prefetch_masks()
+    requests them around the ships ahead of time. A chunk counts as blocked
+    until its mask arrives, so ships hold position rather than sail into
+    land that has not loaded yet.
+    """
+
+    def __init__(self, path: str, cache_size: int = 48, load_margin: int = 1, evict_margin: int = 3,
+                 mask_cache_size: int = 4096, pixels_per_tile: int = 4):
+        self.path = path
+        with open(os.path.join(path, MAP_FILE)) as f:
+            header = json.load(f)
+        self.chunk_tiles = header["chunk_tiles"]
+        self.tile_size = header["tile_size"]
+        self.chunk_size = self.chunk_tiles * self.tile_size
+        self.palette = np.array(header["palette"], dtype=np.uint8)
+        self.cache_size = cache_size
+        self.load_margin = load_margin
+        self.evict_margin = evict_margin
+        self.mask_cache_size = mask_cache_size
+        self.pixels_per_tile = pixels_per_tile
+        self._chunks = OrderedDict()  # (cx, cy) -> TerrainChunk or None for open water
+        self._masks = OrderedDict()   # (cx, cy) -> mask or None
+        self._pending = {}
+        self._mask_pending = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="terrain")
+        self._mask_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="terrain-mask")
+
+    # ---------------- Loading ----------------
+    def _read(self, cx, cy):
+        """Read a chunk from disk; return (tiles, mask) or None for open water."""
+        filename = chunk_file(self.path, cx, cy)
+        if not os.path.exists(filename):
+            return None
+        with np.load(filename) as data:
+            return data["tiles"], data["mask"]
+
+    def _decode(self, cx, cy):
+        """Background job: read a chunk and expand its tiles into RGBA pixels."""
+        loaded = self._read(cx, cy)
+        if loaded is None:
+            return None
+        tiles, mask = loaded
+        # Flip rows so the chunk's bottom tile row becomes the image's bottom row
+        pixels = self.palette[tiles[::-1]]
+        if self.pixels_per_tile > 1:
+            pixels = pixels.repeat(self.pixels_per_tile, axis=0).repeat(self.pixels_per_tile, axis=1)
+        return TerrainChunk(cx, cy, tiles, mask, np.ascontiguousarray(pixels))
+
+    def _read_mask(self, cx, cy):
+        """Background job: read only a chunk's collision mask."""
+        loaded = self._read(cx, cy)
+        return loaded[1] if loaded is not None else None
+
+    def _chunk_range(self, rect, margin):
+        left, bottom, right, top = rect
+        size = self.chunk_size
+        return (int(left // size) - margin, int(bottom // size) - margin,
+                int(right // size) + margin, int(top // size) + margin)
+
+    def update(self, visible_rect):
+        """Queue chunks around the visible world rect, collect finished loads and evict far chunks."""
+        for key, future in list(self._pending.items()):
+            if future.done():
+                del self._pending[key]
+                chunk = future.result()
+                self._chunks[key] = chunk
+                self._remember_mask(key, chunk.mask if chunk is not None else None)
+
+        x0, y0, x1, y1 = self._chunk_range(visible_rect, self.load_margin)
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                key = (cx, cy)
+                if key in self._chunks:
+                    self._chunks.move_to_end(key)
+                elif key not in self._pending:
+                    self._pending[key] = self._executor.submit(self._decode, cx, cy)
+
+        ex0, ey0, ex1, ey1 = self._chunk_range(visible_rect, self.evict_margin)
+        for key in [key for key in self._chunks if not (ex0 <= key[0] <= ex1 and ey0 <= key[1] <= ey1)]:
+            del self._chunks[key]
+        # Drop queued loads the camera has already moved away from
+        for key in [key for key in self._pending if not (ex0 <= key[0] <= ex1 and ey0 <= key[1] <= ey1)]:
+            if self._pending[key].cancel():
+                del self._pending[key]
+        # Chunks in the load range were just moved to the back, so only older ones are trimmed
+        limit = max(self.cache_size, (x1 - x0 + 1) * (y1 - y0 + 1))
+        while len(self._chunks) > limit:
+            self._chunks.popitem(last=False)
+
+    @property
+    def loading(self) -> bool:
+        """Whether chunk loads are still queued or running; they show up after the next update()."""
+        return bool(self._pending)
+
+    def visible_chunks(self, visible_rect):
+        """Yield loaded, non-empty chunks overlapping the visible world rect."""
+        x0, y0, x1, y1 = self._chunk_range(visible_rect, 0)
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                chunk = self._chunks.get((cx, cy))
+                if chunk is not None:
+                    yield chunk
+
+    def chunk_center(self, chunk):
+        return (chunk.cx + 0.5) * self.chunk_size, (chunk.cy + 0.5) * self.chunk_size
+
+    # ---------------- Collision ----------------
+    def _remember_mask(self, key, mask):
+        self._masks[key] = mask
+        self._masks.move_to_end(key)
+        while len(self._masks) > self.mask_cache_size:
+            self._masks.popitem(last=False)
+
+    def _mask(self, key):
+        """Return (known, mask); mask is None for open water, and unknown masks are requested."""
+        if key in self._masks:
+            self._masks.move_to_end(key)
+            return True, self._masks[key]
+        future = self._mask_pending.get(key)
+        if future is None:
+            self._mask_pending[key] = self._mask_executor.submit(self._read_mask, *key)
+            return False, None
+        if not future.done():
+            return False, None
+        del self._mask_pending[key]
+        mask = future.result()
+        self._remember_mask(key, mask)
+        return True, mask
+
+    def prefetch_masks(self, xs, ys, margin: int = 1):
+        """Request the masks of chunks within margin chunks of the given world points."""
+        if len(xs) == 0:
+            return
+        cells = np.floor_divide(np.stack([xs, ys], axis=1), self.chunk_size).astype(np.int64)
+        cells = np.unique(cells, axis=0)
+        offsets = np.arange(-margin, margin + 1)
+        neighbours = np.stack(np.meshgrid(offsets, offsets), axis=-1).reshape(-1, 2)
+        cells = np.unique((cells[:, None, :] + neighbours[None, :, :]).reshape(-1, 2), axis=0)
+        for cx, cy in cells.tolist():
+            key = (cx, cy)
+            if key in self._masks:
+                self._masks.move_to_end(key)
+            elif key not in self._mask_pending:
+                self._mask_pending[key] = self._mask_executor.submit(self._read_mask, cx, cy)
+        # Collect finished reads here so is_blocked() rarely finds a mask still pending
+        for key, future in list(self._mask_pending.items()):
+            if future.done():
+                del self._mask_pending[key]
+                self._remember_mask(key, future.result())
+
+    def is_blocked(self, x: float, y: float) -> bool:
+        """Return True if the world point is on blocking terrain, or its mask has not loaded yet."""
+        cx, cy = int(x // self.chunk_size), int(y // self.chunk_size)
+        known, mask = self._mask((cx, cy))
+        if not known:
+            return True
+        if mask is None:
+            return False
+        tx = int((x - cx * self.chunk_size) // self.tile_size)
+        ty = int((y - cy * self.chunk_size) // self.tile_size)
+        return bool(mask[min(ty, self.chunk_tiles - 1), min(tx, self.chunk_tiles - 1)])
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._mask_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def generate_map(path: str, chunks_x: int = 32, chunks_y: int = 32, seed: int = 0, chunk_tiles: int = 16):
+    """Write a demo archipelago centered on the origin, leaving the middle open."""
+    header = write_map(path, chunk_tiles)
+    rng = np.random.default_rng(seed)
+    size = chunk_tiles * header["tile_size"]
+    world_w, world_h = chunks_x * size, chunks_y * size
+    islands = rng.uniform([-world_w / 2, -world_h / 2, 300], [world_w / 2, world_h / 2, 1500], size=(chunks_x * chunks_y // 2, 3))
+    islands = islands[np.hypot(islands[:, 0], islands[:, 1]) > islands[:, 2] + 1500]
+    offsets = (np.arange(chunk_tiles) + 0.5) * header["tile_size"]
+    for cy in range(-chunks_y // 2, chunks_y // 2):
+        for cx in range(-chunks_x // 2, chunks_x // 2):
+            xs = cx * size + offsets[None, :]
+            ys = cy * size + offsets[:, None]
+            height = np.zeros((chunk_tiles, chunk_tiles))
+            for ix, iy, radius in islands:
+                height = np.maximum(height, 1 - np.hypot(xs - ix, ys - iy) / radius)
+            if not (height > 0).any():
+                continue
+            tiles = np.digitize(height, [0.0001, 0.15, 0.3, 0.8]).astype(np.uint8)
+            write_chunk(path, cx, cy, tiles, header["blocking"])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "generate":
+        print(__doc__)
+        sys.exit(1)
+    args = [int(value) for value in sys.argv[3:6]]
+    generate_map(sys.argv[2], *args)
+    print(f"Wrote map to {sys.argv[2]}")
@@ -1,12 +1,18 @@
-from panda2d import Image
+from panda2d import Image, SceneNode
+from particles import WakeEmitter
 
 class Unit:
     """Represents a unit in the game."""
 
     def __init__(
         self, image: Image, health: int, attack: int, defense: int,
-        speed: int, rotation_speed: int, friction: float = 0.95, rotation_friction: float = 0.9
+        speed: int, rotation_speed: int, friction: float = 0.95, rotation_friction: float = 0.9,
+        guns: int = 1, reload_time: float = 1.0, projectile_speed: float = 600, weapon_range: float = 1500,
+        vision_range: float = 1500
     ):
+        self.id = None  # Stable id, assigned when spawned into a world
+        self.handle = None  # Handle in the world's EntityRegistry
+
         # Apperance
         self.image = image
         self.scale = 1.0
@@ -37,11 +43,41 @@ class Unit:
         self.gun_direction = 0  # Direction the unit's gun is facing (degrees)
         self.target_position_x = 0  # Target position for shooting (X coordinate)
         self.target_position_y = 0  # Target position for shooting (Y coordinate)
+        self.target = None  # Enemy unit picked by the targeting system
+        self.guns = guns  # Shells fired per salvo
+        self.reload_time = reload_time  # Seconds between salvos
+        self.reload_timer = 0  # Seconds until the next salvo is ready
+        self.projectile_speed = projectile_speed  # Shell speed in world units per second
+        self.weapon_range = weapon_range  # Maximum shell travel distance
+
+        # Vision
+        self.vision_range = vision_range  # Fog-of-war vision radius in world units
 
         # Autonomous control
         self.autonomous = False  # Whether the unit is controlled autonomously
         self.autonomous_target_x = 0  # Autonomous target position X
         self.autonomous_target_y = 0  # Autonomous target position Y
+        self.ai_bearing = 0.0  # Heading to the target at the last plan (degrees)
+        self.ai_stopped = False  # Whether the last plan found the unit at its target
+
+        # Scene graph node; attached sprites (arrow, markers, turrets) are its children
+        self.node = SceneNode(image)
+
+        # Effects
+        self.wake_emitter = None  # WakeEmitter shedding foam while the unit moves
+
+    @property
+    def radius(self):
+        """Bounding circle radius in world units."""
+        return max(self.image.get_width(), self.image.get_height()) * self.scale / 2
+
+    @property
+    def alive(self):
+        return self.health > 0
+
+    def sync_node(self):
+        """Copy the unit's position and heading into its scene node."""
+        self.node.set_transform(self.position_x, self.position_y, self.direction, self.scale)
 
 
 class Battleship(Unit):
@@ -49,14 +85,19 @@ class Battleship(Unit):
 
     def __init__(self, team, position_x=0, position_y=0, direction=0):
         super().__init__(
-            Image("assets/images/battleship.png"),
+            Image("assets/images/battleship.png", mipmaps=True),
             health=600,
             attack=150,
             defense=100,
             speed=100,
             rotation_speed=100,
             friction=0.97,
-            rotation_friction=0.9
+            rotation_friction=0.9,
+            guns=3,
+            reload_time=2.5,
+            projectile_speed=700,
+            weapon_range=1800,
+            vision_range=2000
         )
         self.team = team
         self.position_x = position_x
@@ -64,3 +105,4 @@ class Battleship(Unit):
         self.target_position_x = position_x
         self.target_position_y = position_y
         self.direction = direction
+        self.wake_emitter = WakeEmitter(offset=-100)  # Stern of the 233 px hull
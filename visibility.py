@@ -0,0 +1,79 @@
+import numpy as np
+
+
+class VisibilityGrid:
+    """Per-team fog-of-war grid with reference-counted vision cells.
+
+    Each tracked unit stamps a disk of cells into its team's count grid.
+    A unit only restamps when it crosses a cell boundary (or its team or
+    vision changes), so the cost follows movement rather than fleet size.
+    The world is covered by a fixed grid centered on the origin; positions
+    outside it are clamped to the border cells.
+    """
+
+    def __init__(self, team_count: int, cell_size: float = 200, cols: int = 256, rows: int = 256):
+        self.cell_size = cell_size
+        self.cols, self.rows = cols, rows
+        self.origin_x = -cols * cell_size / 2
+        self.origin_y = -rows * cell_size / 2
+        self.counts = np.zeros((team_count, rows, cols), dtype=np.int16)
+        self.visible = np.zeros((team_count, rows, cols), dtype=bool)
+        self._units = {}  # unit -> (team, cell_x, cell_y, radius_cells)
+        self._disks = {}
+
+    def _cell(self, x, y):
+        cx = int((x - self.origin_x) // self.cell_size)
+        cy = int((y - self.origin_y) // self.cell_size)
+        return min(max(cx, 0), self.cols - 1), min(max(cy, 0), self.rows - 1)
+
+    def _disk(self, radius: int):
+        disk = self._disks.get(radius)
+        if disk is None:
+            offsets = np.arange(-radius, radius + 1)
+            disk = (offsets[None, :] ** 2 + offsets[:, None] ** 2 <= radius * radius).astype(np.int16)
+            self._disks[radius] = disk
+        return disk
+
+    def _stamp(self, team, cx, cy, radius, add: bool):
+        disk = self._disk(radius)
+        x0, y0 = max(cx - radius, 0), max(cy - radius, 0)
+        x1, y1 = min(cx + radius + 1, self.cols), min(cy + radius + 1, self.rows)
+        dx0, dy0 = x0 - (cx - radius), y0 - (cy - radius)
+        counts = self.counts[team, y0:y1, x0:x1]
+        part = disk[dy0:dy0 + (y1 - y0), dx0:dx0 + (x1 - x0)]
+        if add:
+            counts += part
+        else:
+            counts -= part
+        np.greater(counts, 0, out=self.visible[team, y0:y1, x0:x1])
+
+    def update_unit(self, unit, team: int, x: float, y: float, vision: float):
+        """Move a unit's vision disk; does nothing unless it changed cell, team or range."""
+        cx, cy = self._cell(x, y)
+        radius = int(vision // self.cell_size)
+        state = (team, cx, cy, radius)
+        previous = self._units.get(unit)
+        if previous == state:
+            return False
+        if previous is not None:
+            self._stamp(previous[0], previous[1], previous[2], previous[3], add=False)
+        self._stamp(team, cx, cy, radius, add=True)
+        self._units[unit] = state
+        return True
+
+    def remove_unit(self, unit):
+        """Stop tracking a unit and clear its vision."""
+        previous = self._units.pop(unit, None)
+        if previous is not None:
+            self._stamp(previous[0], previous[1], previous[2], previous[3], add=False)
+
+    def is_visible(self, team: int, x: float, y: float) -> bool:
+        """Return True if the world point is inside the team's vision."""
+        cx, cy = self._cell(x, y)
+        return bool(self.visible[team, cy, cx])
+
+    def visible_mask(self, team: int, xs, ys):
+        """Vectorized is_visible for arrays of world positions."""
+        cxs = ((np.asarray(xs) - self.origin_x) // self.cell_size).astype(int).clip(0, self.cols - 1)
+        cys = ((np.asarray(ys) - self.origin_y) // self.cell_size).astype(int).clip(0, self.rows - 1)
+        return self.visible[team, cys, cxs]